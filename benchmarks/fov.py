@@ -0,0 +1,187 @@
+import random
+import time
+from argparse import ArgumentParser
+from typing import Callable, Dict, List, Sequence, Tuple
+
+from pitd.fov import FOV, GridFOV
+from pitd.map.tiles import FLAG_VISIBLE, TileStore, TileType, TileView
+
+from .maps import MAPS
+from .reference import ReferenceFOV
+
+__all__ = ["IMPLEMENTATIONS", "reference_mask", "verify", "run", "main"]
+
+# An implementation is built once per (grid, radius) and then called with an
+# origin, returning a 0/1 visibility mask over the whole grid.
+Engine = Callable[[int, int], bytes | bytearray]
+EngineFactory = Callable[[bytearray, int, int, int], Engine]
+
+_VISIBLE: bytes = bytes(int(bool(code & FLAG_VISIBLE)) for code in range(256))
+
+
+def _tile_store(grid: bytearray, width: int, height: int) -> TileStore:
+    tiles = TileStore(width)
+    types = grid.translate(
+        bytes(TileType.FLOOR if code else TileType.WALL for code in range(256))
+    )
+    for y in range(height):
+        row = types[y * width : (y + 1) * width]
+        tiles.append_row(row, bytes(width), bytes(width))
+    return tiles
+
+
+def _callback_engine(fov_class) -> EngineFactory:
+    def factory(grid: bytearray, width: int, height: int, radius: int) -> Engine:
+        tiles = _tile_store(grid, width, height)
+        fov = fov_class(radius, TileView.is_wall, TileView.set_visible)
+
+        def compute(x: int, y: int) -> bytes:
+            tiles.fill_flag(FLAG_VISIBLE, False)
+            fov.check_visibility(x, y, tiles)
+            return bytes(tiles.flags).translate(_VISIBLE)
+
+        return compute
+
+    return factory
+
+
+def _grid_engine(grid: bytearray, width: int, height: int, radius: int) -> Engine:
+    fov = GridFOV(radius)
+    return lambda x, y: fov.compute(x, y, grid, width, height)
+
+
+IMPLEMENTATIONS: Dict[str, EngineFactory] = {
+    "grid": _grid_engine,
+    "fov": _callback_engine(FOV),
+    "reference": _callback_engine(ReferenceFOV),
+}
+
+
+def reference_mask(
+    x: int, y: int, grid: bytearray, width: int, height: int, radius: int
+) -> bytes | bytearray:
+    return _callback_engine(ReferenceFOV)(grid, width, height, radius)(x, y)
+
+
+def _origins(
+    grid: bytearray, width: int, count: int, rng: random.Random
+) -> List[Tuple[int, int]]:
+    open_cells = [i for i, cell in enumerate(grid) if cell] or [0]
+    return [divmod(rng.choice(open_cells), width)[::-1] for _ in range(count)]
+
+
+def verify(
+    impl: str,
+    grid: bytearray,
+    width: int,
+    height: int,
+    radius: int,
+    origins: Sequence[Tuple[int, int]],
+) -> List[Tuple[int, int]]:
+    engine = IMPLEMENTATIONS[impl](grid, width, height, radius)
+    oracle = IMPLEMENTATIONS["reference"](grid, width, height, radius)
+    return [(x, y) for x, y in origins if bytes(engine(x, y)) != bytes(oracle(x, y))]
+
+
+def _percentile(samples: List[int], pct: float) -> float:
+    index = min(len(samples) - 1, int(round(pct / 100 * (len(samples) - 1))))
+    return samples[index] / 1000
+
+
+def _measure(engine: Engine, origins: Sequence[Tuple[int, int]]) -> Dict[str, float]:
+    timings: List[int] = []
+    visible = 0
+    for x, y in origins:
+        start = time.perf_counter_ns()
+        mask = engine(x, y)
+        timings.append(time.perf_counter_ns() - start)
+        visible += sum(mask)
+    total = sum(timings) / 1e9 or 1e-9
+    timings.sort()
+    return {
+        "calls/s": len(timings) / total,
+        "tiles/s": visible / total,
+        "p50 us": _percentile(timings, 50),
+        "p90 us": _percentile(timings, 90),
+        "p99 us": _percentile(timings, 99),
+        "max us": timings[-1] / 1000,
+    }
+
+
+def run(
+    maps: Sequence[str],
+    sizes: Sequence[int],
+    radii: Sequence[int],
+    impls: Sequence[str],
+    samples: int = 100,
+    verify_samples: int = 10,
+    seed: int = 0,
+    out: Callable[[str], None] = print,
+) -> int:
+    columns = ["calls/s", "tiles/s", "p50 us", "p90 us", "p99 us", "max us"]
+    out(
+        f"{'map':<8}{'size':>6}{'radius':>8}  {'impl':<10}"
+        + "".join(f"{c:>12}" for c in columns)
+        + "  check"
+    )
+    failures = 0
+    for name in maps:
+        for size in sizes:
+            rng = random.Random(f"{seed}:{name}:{size}")
+            grid = MAPS[name](size, size, rng)
+            for radius in radii:
+                origins = _origins(grid, size, samples, rng)
+                for impl in impls:
+                    check = "-"
+                    bad: List[Tuple[int, int]] = []
+                    if verify_samples and impl != "reference":
+                        checked = origins[:verify_samples]
+                        bad = verify(impl, grid, size, size, radius, checked)
+                        failures += len(bad)
+                        check = "ok" if not bad else f"FAIL {len(bad)}/{len(checked)}"
+                    engine = IMPLEMENTATIONS[impl](grid, size, size, radius)
+                    stats = _measure(engine, origins)
+                    out(
+                        f"{name:<8}{size:>6}{radius:>8}  {impl:<10}"
+                        + "".join(f"{stats[c]:>12.1f}" for c in columns)
+                        + f"  {check}"
+                    )
+                    if bad:
+                        out("  differs from reference at " + ", ".join(map(str, bad)))
+    return failures
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(v) for v in value.split(",")]
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = ArgumentParser(
+        prog="benchmarks.fov",
+        description="Benchmark FOV implementations on synthetic maps",
+    )
+    parser.add_argument("--maps", default=",".join(MAPS))
+    parser.add_argument("--sizes", type=_int_list, default=[64, 200])
+    parser.add_argument("--radii", type=_int_list, default=[5, 10, 20])
+    parser.add_argument("--impls", default="grid,fov")
+    parser.add_argument("--samples", type=int, default=100)
+    parser.add_argument("--verify-samples", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    failures = run(
+        args.maps.split(","),
+        args.sizes,
+        args.radii,
+        args.impls.split(","),
+        args.samples,
+        args.verify_samples,
+        args.seed,
+    )
+    if failures:
+        print(f"{failures} origin(s) differ from the reference FOV")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
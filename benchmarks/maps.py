@@ -0,0 +1,75 @@
+import random
+from typing import Callable, Dict
+
+__all__ = ["MAPS", "open_room", "pillars", "maze", "cave"]
+
+# Every generator returns a transparency grid: one byte per cell, row-major,
+# 1 where light passes and 0 for walls.
+MapFunc = Callable[[int, int, random.Random], bytearray]
+
+
+def _border(grid: bytearray, width: int, height: int) -> bytearray:
+    grid[0:width] = bytes(width)
+    grid[(height - 1) * width :] = bytes(width)
+    grid[::width] = bytes(height)
+    grid[width - 1 :: width] = bytes(height)
+    return grid
+
+
+def open_room(width: int, height: int, rng: random.Random) -> bytearray:
+    return _border(bytearray(b"\x01" * (width * height)), width, height)
+
+
+def pillars(width: int, height: int, rng: random.Random) -> bytearray:
+    grid = bytearray(b"\x01" * (width * height))
+    for y in range(2, height, 4):
+        grid[y * width + 2 : (y + 1) * width : 4] = bytes(len(range(2, width, 4)))
+    return _border(grid, width, height)
+
+
+def maze(width: int, height: int, rng: random.Random) -> bytearray:
+    grid = bytearray(width * height)
+    stack = [(1, 1)]
+    grid[width + 1] = 1
+    while stack:
+        x, y = stack[-1]
+        options = [
+            (x + dx, y + dy, dx, dy)
+            for dx, dy in ((2, 0), (-2, 0), (0, 2), (0, -2))
+            if 0 < x + dx < width - 1
+            and 0 < y + dy < height - 1
+            and not grid[(y + dy) * width + x + dx]
+        ]
+        if not options:
+            stack.pop()
+            continue
+        nx, ny, dx, dy = rng.choice(options)
+        grid[(y + dy // 2) * width + x + dx // 2] = 1
+        grid[ny * width + nx] = 1
+        stack.append((nx, ny))
+    return grid
+
+
+def cave(width: int, height: int, rng: random.Random) -> bytearray:
+    grid = bytearray(rng.random() >= 0.45 for _ in range(width * height))
+    for _ in range(4):
+        smoothed = bytearray(width * height)
+        for y in range(1, height - 1):
+            for x in range(1, width - 1):
+                i = y * width + x
+                walls = 9 - (
+                    sum(grid[i - width - 1 : i - width + 2])
+                    + sum(grid[i - 1 : i + 2])
+                    + sum(grid[i + width - 1 : i + width + 2])
+                )
+                smoothed[i] = walls < 5
+        grid = smoothed
+    return _border(grid, width, height)
+
+
+MAPS: Dict[str, MapFunc] = {
+    "open": open_room,
+    "pillars": pillars,
+    "maze": maze,
+    "cave": cave,
+}
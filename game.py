@@ -1,5 +1,32 @@
 import os
+from argparse import ArgumentParser
 from pitd import PITD
+from pitd.scene import registry
 
 if __name__ == "__main__":
-    PITD(os.getcwd(), (800, 600)).run()
+    parser = ArgumentParser(prog="PITD", description="Portal in the Depths")
+    parser.add_argument(
+        "--scene", default="bsp", choices=registry.scene_names(), help="scene to run"
+    )
+    parser.add_argument(
+        "--headless", action="store_true", help="run without opening a window"
+    )
+    parser.add_argument(
+        "--frames", type=int, help="stop after this many frames (headless only)"
+    )
+    parser.add_argument(
+        "--no-render", action="store_true", help="skip rendering (headless only)"
+    )
+    args = parser.parse_args()
+
+    game = PITD(
+        os.getcwd(),
+        (800, 600),
+        headless=args.headless,
+        scene=args.scene,
+        cache_dir=os.path.join(os.getcwd(), ".cache", "layouts"),
+    )
+    if args.headless:
+        game.simulate(args.frames, render=not args.no_render)
+    else:
+        game.run()
@@ -1,50 +1,204 @@
 from .scene import Scene
-
-# from .scene.mapgen_scene import MapGenScene
-from .scene.bsp_scene import BSPScene
+from .scene import registry
+from .scene.loading import LoadingScene
+from .profiler import EVENTS, FLIP, RENDER, UPDATE, FrameProfiler
+import os
 import pygame
-from typing import Tuple
+import time
+from typing import Any, Dict, List, Tuple
 
 __all__ = ["PITD"]
 
 
 class PITD:
-    def __init__(self, game_dir: str, size: Tuple[int, int]):
+    def __init__(
+        self,
+        game_dir: str,
+        size: Tuple[int, int],
+        sim_rate: float = 60.0,
+        render_rate: float = 60.0,
+        max_frame_skip: int = 5,
+        idle_timeout: float | None = 0.5,
+        headless: bool = False,
+        profile: bool = False,
+        profile_path: str | None = None,
+        scene: str = "bsp",
+        scene_args: Dict[str, Any] | None = None,
+        cache_dir: str | None = None,
+    ):
         self.game_dir: str = game_dir
         self.surface: pygame.Surface
         self.size: Tuple[int, int] = size
+        self.headless: bool = headless
+        self.frames: int = 0
         self._setup()
-        self.dt: float = -1.0
-        self.scene: Scene = BSPScene()
-        self.clock: pygame.Clock = pygame.Clock()
+        # The simulation always advances in fixed steps of dt seconds.
+        self.dt: float = 1.0 / sim_rate
+        self.render_interval: float = 1.0 / render_rate
+        self.max_frame_skip: int = max_frame_skip
+        # How long to block waiting for input while the scene has nothing to
+        # draw; None keeps ticking the simulation at full rate instead.
+        self.idle_timeout: float | None = idle_timeout
+        # Scenes are imported and built on demand; their expensive load()
+        # runs in the background behind a loading screen. Headless runs load
+        # up front instead, so frame budgets are spent on the scene itself.
+        target = registry.create(scene, game_dir, cache_dir, **(scene_args or {}))
+        if headless:
+            target.load()
+            target.activate()
+            self.scene: Scene = target
+        else:
+            self.scene = LoadingScene(target)
         self.running: bool = True
+        # Per-phase frame timings; F3 toggles the on-screen summary and
+        # profile_path (.json or .csv) receives them when the game exits.
+        self.profiler: FrameProfiler = FrameProfiler(
+            enabled=profile or profile_path is not None
+        )
+        self.profile_path: str | None = profile_path
+        self.show_profile: bool = False
 
     def run(self) -> None:
+        if self.headless:
+            self.simulate()
+            return
+        previous = time.perf_counter()
+        lag = 0.0
+        next_render = previous
+        profiler = self.profiler
         while self.running:
-            for e in pygame.event.get():
-                if e.type == pygame.QUIT:
-                    self.running = False
-                self.scene.get_event(e)
-                if self.running:
-                    self.running = not self.scene.should_quit()
+            profiler.begin(type(self.scene).__name__)
+            self._handle_events(pygame.event.get())
+            profiler.lap(EVENTS)
+
+            now = time.perf_counter()
+            lag += now - previous
+            previous = now
+            steps = 0
+            while lag >= self.dt and steps < self.max_frame_skip and self.running:
+                self._update()
+                lag -= self.dt
+                steps += 1
+            if lag >= self.dt:
+                # Too far behind to catch up; drop the backlog rather than
+                # spending every frame on updates.
+                lag = 0.0
+            profiler.lap(UPDATE)
+
+            if now >= next_render:
+                next_render = max(next_render + self.render_interval, now)
+                if self.scene.needs_render() or self.show_profile:
+                    self._render()
+                elif self.idle_timeout is not None:
+                    profiler.end()
+                    self._idle()
+                    previous = time.perf_counter()
+                    lag = self.dt
+                    next_render = previous
+                    continue
+
+            profiler.end()
+            self._wait(min(previous + self.dt - lag, next_render))
+        self._export_profile()
+
+    def simulate(self, frames: int | None = None, render: bool = True) -> int:
+        # Step the scene back to back, without sleeping or waiting for the
+        # display, until it quits or the frame budget is spent.
+        done = 0
+        profiler = self.profiler
+        while self.running and (frames is None or done < frames):
+            profiler.begin(type(self.scene).__name__)
+            self._handle_events(pygame.event.get())
+            profiler.lap(EVENTS)
+            if not self.running:
+                break
             self._update()
-            self._render()
-            self._tick()
+            profiler.lap(UPDATE)
+            if render and (self.scene.needs_render() or self.show_profile):
+                self._render()
+            profiler.end()
+            done += 1
+        self._export_profile()
+        return done
 
     def _setup(self) -> None:
-        pygame.init()
+        driver = os.environ.get("SDL_VIDEODRIVER")
+        if self.headless:
+            # Input and fonts still need SDL's video subsystem, which the
+            # dummy driver provides without a display. SDL only reads the
+            # variable while initialising, so the caller's value is put back.
+            os.environ["SDL_VIDEODRIVER"] = "dummy"
+        try:
+            pygame.init()
+        finally:
+            if driver is None:
+                os.environ.pop("SDL_VIDEODRIVER", None)
+            else:
+                os.environ["SDL_VIDEODRIVER"] = driver
         pygame.font.init()
-        self.surface = pygame.display.set_mode(self.size)
-        pygame.display.set_caption("PITD")
+        if self.headless:
+            self.surface = pygame.Surface(self.size)
+        else:
+            self.surface = pygame.display.set_mode(self.size)
+            pygame.display.set_caption("PITD")
+
+    def _handle_events(self, events: List[pygame.Event]) -> None:
+        for e in events:
+            if e.type == pygame.QUIT:
+                self.running = False
+            elif e.type == pygame.WINDOWEXPOSED:
+                self.scene.invalidate()
+            elif (
+                e.type == pygame.KEYDOWN
+                and e.key == pygame.K_F3
+                and self.profiler.enabled
+            ):
+                self.show_profile = not self.show_profile
+                if not self.show_profile:
+                    # Repaint whatever the overlay was covering.
+                    self.scene.invalidate()
+            self.scene.get_event(e)
+            if self.running:
+                self.running = not self.scene.should_quit()
 
     def _update(self) -> None:
-        if self.dt < 0.0:
-            pass
-        self.scene.update(self.dt)
+        scene = self.scene.update(self.dt)
+        if scene is not self.scene:
+            self.scene = scene
+            self.scene.invalidate()
+        self.frames += 1
 
     def _render(self) -> None:
         self.scene.render(self.surface)
-        pygame.display.flip()
+        rects = self.scene.dirty_rects()
+        if self.show_profile:
+            overlay = self.profiler.draw_overlay(
+                self.surface, type(self.scene).__name__
+            )
+            if rects is not None:
+                rects = [*rects, overlay]
+        self.profiler.lap(RENDER)
+        if self.headless:
+            return
+        if rects is None:
+            pygame.display.flip()
+        elif rects:
+            pygame.display.update(rects)
+        self.profiler.lap(FLIP)
+
+    def _export_profile(self) -> None:
+        if self.profile_path is not None and self.profiler.enabled:
+            self.profiler.export(self.profile_path)
+
+    def _idle(self) -> None:
+        # Nothing on screen will change until input arrives, so sleep on the
+        # event queue; the caller then runs a single update for it.
+        assert self.idle_timeout is not None
+        event = pygame.event.wait(int(self.idle_timeout * 1000))
+        if event.type != pygame.NOEVENT:
+            self._handle_events([event, *pygame.event.get()])
 
-    def _tick(self) -> None:
-        self.dt = self.clock.tick(60) / 1000
+    def _wait(self, until: float) -> None:
+        delay = until - time.perf_counter()
+        if delay > 0.0:
+            time.sleep(delay)
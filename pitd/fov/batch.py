@@ -0,0 +1,91 @@
+from typing import Dict, List, Sequence, Tuple
+
+from ..pool import ChunkedPool
+from .grid import GridFOV
+
+__all__ = ["BatchFOV"]
+
+Observer = Tuple[int, int, int]
+
+# Per-worker copy of the shared grid, installed once by _init_worker so each
+# task only ships observer positions across the process boundary.
+_worker_grid: Tuple[bytes, int, int] | None = None
+
+
+def _init_worker(transparent: bytes, width: int, height: int) -> None:
+    global _worker_grid
+    _worker_grid = (transparent, width, height)
+
+
+def _compute_chunk(observers: Sequence[Observer]) -> List[bytes]:
+    assert _worker_grid is not None
+    transparent, width, height = _worker_grid
+    return _compute(observers, transparent, width, height)
+
+
+def _compute(
+    observers: Sequence[Observer], transparent, width: int, height: int
+) -> List[bytes]:
+    engines: Dict[int, GridFOV] = {}
+    out = bytearray(width * height)
+    masks: List[bytes] = []
+    for x, y, radius in observers:
+        fov = engines.get(radius)
+        if fov is None:
+            fov = engines[radius] = GridFOV(radius)
+        masks.append(bytes(fov.compute(x, y, transparent, width, height, out)))
+    return masks
+
+
+class BatchFOV:
+    def __init__(
+        self,
+        transparent,
+        width: int,
+        height: int,
+        workers: int = 0,
+        chunks_per_worker: int = 4,
+    ):
+        self.width: int = width
+        self.height: int = height
+        self.workers: int = workers
+        self.chunks_per_worker: int = chunks_per_worker
+        self.transparent: bytes = self._snapshot(transparent)
+        self._pool: ChunkedPool = self._make_pool()
+
+    def __enter__(self) -> "BatchFOV":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._pool.close()
+
+    def update_grid(self, transparent) -> None:
+        # Workers hold their own copy of the grid, so they must be restarted.
+        self.transparent = self._snapshot(transparent)
+        self.close()
+        self._pool = self._make_pool()
+
+    def compute(self, observers: Sequence[Observer]) -> List[bytes]:
+        if self.workers <= 1 or len(observers) < 2:
+            return _compute(observers, self.transparent, self.width, self.height)
+        return self._pool.map(_compute_chunk, observers)
+
+    def _make_pool(self) -> ChunkedPool:
+        return ChunkedPool(
+            self.workers,
+            self.chunks_per_worker,
+            initializer=_init_worker,
+            initargs=(self.transparent, self.width, self.height),
+        )
+
+    def _snapshot(self, transparent) -> bytes:
+        data = bytes(memoryview(transparent).cast("B"))
+        if len(data) != self.width * self.height:
+            raise ValueError(
+                f"transparency grid has {len(data)} cells, "
+                f"expected {self.width}x{self.height}"
+            )
+        return data
@@ -0,0 +1,56 @@
+from collections import OrderedDict
+from typing import Tuple
+
+from .grid import GridFOV
+
+__all__ = ["FOVCache"]
+
+
+class FOVCache:
+    def __init__(self, fov: GridFOV, maxsize: int = 64):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.fov: GridFOV = fov
+        self.maxsize: int = maxsize
+        self.hits: int = 0
+        self.misses: int = 0
+        self._revision: int | None = None
+        # (x, y, radius, revision, origin x, origin y, width, height)
+        self._entries: OrderedDict[Tuple[int, ...], bytes] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def compute(
+        self,
+        x: int,
+        y: int,
+        transparent,
+        width: int,
+        height: int,
+        revision: int,
+        origin: Tuple[int, int] = (0, 0),
+    ) -> bytes:
+        if revision != self._revision:
+            # Masks from an older revision of the map can never be hit again.
+            self._entries.clear()
+            self._revision = revision
+        # The grid may be a window onto a larger map; origin is the map
+        # position of its top-left cell. Masks cover the window, so its
+        # placement and size are part of the key.
+        ox, oy = origin
+        key = (x, y, self.fov.radius, revision, ox, oy, width, height)
+        mask = self._entries.get(key)
+        if mask is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return mask
+        self.misses += 1
+        mask = bytes(self.fov.compute(x - ox, y - oy, transparent, width, height))
+        self._entries[key] = mask
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        return mask
@@ -0,0 +1,86 @@
+from .shadow import OCTANTS, ShadowList
+
+__all__ = ["GridFOV"]
+
+
+def _limit(pos: int, step: int, size: int) -> int:
+    if step > 0:
+        return size - 1 - pos
+    if step < 0:
+        return pos
+    return 0
+
+
+class GridFOV:
+    def __init__(self, radius: int):
+        self.radius = radius
+
+    def compute(
+        self,
+        x: int,
+        y: int,
+        transparent,
+        width: int,
+        height: int,
+        out: bytearray | None = None,
+    ) -> bytearray:
+        if not isinstance(transparent, (bytes, bytearray)):
+            transparent = memoryview(transparent).cast("B")
+        size = width * height
+        if len(transparent) != size:
+            raise ValueError(
+                f"transparency grid has {len(transparent)} cells, "
+                f"expected {width}x{height}"
+            )
+        if out is None:
+            out = bytearray(size)
+        else:
+            out[:] = bytes(size)
+        if not (0 <= x < width and 0 <= y < height):
+            return out
+
+        origin = y * width + x
+        out[origin] = 1
+        for pdx, pdy, sdx, sdy in OCTANTS:
+            depth = min(
+                self.radius, _limit(x, pdx, width) + _limit(y, pdy, height)
+            )
+            breadth = _limit(x, sdx, width) + _limit(y, sdy, height)
+            self._scan(
+                transparent,
+                out,
+                origin,
+                pdx + pdy * width,
+                sdx + sdy * width,
+                depth,
+                breadth,
+            )
+        return out
+
+    def _scan(
+        self,
+        transparent,
+        out: bytearray,
+        origin: int,
+        d_step: int,
+        i_step: int,
+        depth: int,
+        breadth: int,
+    ) -> None:
+        shadows = ShadowList()
+        for d in range(1, depth + 1):
+            angle_range = 1.0 / d
+            half = angle_range / 2.0
+            base = origin + d * d_step
+            for i in range(min(d, breadth) + 1):
+                start = i * angle_range
+                end = start + angle_range
+                idx = base + i * i_step
+                opaque = not transparent[idx]
+                if shadows.is_visible(start, start + half, end, opaque):
+                    out[idx] = 1
+                    if not opaque:
+                        continue
+                shadows.add(start, end)
+            if shadows.blocks_beyond(d):
+                break
@@ -0,0 +1,64 @@
+from bisect import bisect_left, bisect_right
+from typing import List, Tuple
+
+__all__ = ["OCTANTS", "ShadowList"]
+
+# (primary dx, primary dy, secondary dx, secondary dy) for each octant. A cell
+# at depth d and offset i from the origin is origin + d * primary + i * secondary.
+OCTANTS: Tuple[Tuple[int, int, int, int], ...] = (
+    (0, -1, -1, 0),
+    (0, -1, 1, 0),
+    (0, 1, -1, 0),
+    (0, 1, 1, 0),
+    (-1, 0, 0, 1),
+    (1, 0, 0, 1),
+    (-1, 0, 0, -1),
+    (1, 0, 0, -1),
+)
+
+# Slack for the "everything further out is shadowed" test, far larger than the
+# rounding error in the cell angles but far smaller than any cell.
+_EPSILON: float = 1e-9
+
+
+# Disjoint closed angle intervals blocked within one octant, sorted by start.
+class ShadowList:
+    __slots__ = ("starts", "ends")
+
+    def __init__(self) -> None:
+        self.starts: List[float] = []
+        self.ends: List[float] = []
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def covers(self, angle: float) -> bool:
+        i = bisect_right(self.starts, angle) - 1
+        return i >= 0 and angle <= self.ends[i]
+
+    def covers_range(self, start: float, end: float) -> bool:
+        i = bisect_right(self.starts, start) - 1
+        return i >= 0 and end <= self.ends[i]
+
+    def add(self, start: float, end: float) -> None:
+        # Intervals [lo, hi) overlap or touch the new one and are folded in.
+        lo = bisect_left(self.ends, start)
+        hi = bisect_right(self.starts, end)
+        if lo < hi:
+            start = min(start, self.starts[lo])
+            end = max(end, self.ends[hi - 1])
+        self.starts[lo:hi] = [start]
+        self.ends[lo:hi] = [end]
+
+    def is_visible(
+        self, start: float, middle: float, end: float, opaque: bool
+    ) -> bool:
+        mid_lit = not self.covers(middle)
+        if opaque:
+            return mid_lit or not self.covers(start) or not self.covers(end)
+        return mid_lit and (not self.covers(start) or not self.covers(end))
+
+    def blocks_beyond(self, depth: int) -> bool:
+        # Cells at depth d span angles [0, 1 + 1 / d], so once [0, 1 + 1 / d]
+        # is shadowed for the next depth, nothing further out can be seen.
+        return self.covers_range(0.0, 1.0 + 1.0 / (depth + 1) + _EPSILON)
@@ -0,0 +1,22 @@
+import os
+import tempfile
+from contextlib import contextmanager
+from typing import BinaryIO, Iterator
+
+__all__ = ["atomic_write"]
+
+
+@contextmanager
+def atomic_write(path: str) -> Iterator[BinaryIO]:
+    # Write to a temporary file next to path and rename it into place on
+    # success, so other processes never open a half-written file.
+    fd, tmp = tempfile.mkstemp(
+        prefix=os.path.basename(path), dir=os.path.dirname(path) or "."
+    )
+    try:
+        with os.fdopen(fd, "wb") as f:
+            yield f
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
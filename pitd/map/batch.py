@@ -0,0 +1,119 @@
+from dataclasses import dataclass
+from array import array
+from functools import partial
+from typing import ClassVar, List, Protocol, Sequence, Tuple
+
+from ..math.rect import Rect
+from ..pool import ChunkedPool
+from .bsp import BSP
+from .map_gen import MapGen
+
+__all__ = [
+    "BSPParams",
+    "MapGenParams",
+    "BatchGenerator",
+    "Generator",
+    "unpack_rooms",
+]
+
+
+class Generator(Protocol):
+    # Bumped whenever the same parameters and seed would produce different
+    # output, so cached layouts from older code are not reused.
+    version: ClassVar[int]
+
+    def generate(self, seed: str) -> bytes:
+        ...
+
+
+@dataclass(frozen=True)
+class BSPParams:
+    width: int
+    height: int
+    min_node_size: int
+    max_room_size: int
+    max_depth: int
+    min_room: Tuple[int, int]
+    max_room: Tuple[int, int]
+    max_rooms: int | None = None
+    # Only the absolute room rectangles (see unpack_rooms) rather than the
+    # whole tree (see BSP.from_bytes).
+    rooms_only: bool = True
+
+    # 2: prune() samples the rooms to drop instead of flipping coins.
+    # 3: whole trees carry their generation RNG state.
+    version: ClassVar[int] = 3
+
+    def build(self, seed: str) -> BSP:
+        tree = BSP(self.width, self.height, self.min_node_size, self.max_room_size)
+        tree.generate(seed, self.max_depth)
+        tree.generate_rooms(self.min_room, self.max_room)
+        if self.max_rooms is not None:
+            tree.prune(self.max_rooms)
+        return tree
+
+    def generate(self, seed: str) -> bytes:
+        tree = self.build(seed)
+        if not self.rooms_only:
+            return tree.to_bytes()
+        rooms = array("i")
+        for bounds in tree.room_bounds():
+            rooms.extend(bounds)
+        return rooms.tobytes()
+
+
+@dataclass(frozen=True)
+class MapGenParams:
+    width: int
+    height: int
+    min_size: int
+    max_size: int
+
+    # 2: rooms are bounds-checked against the map height, not its width.
+    version: ClassVar[int] = 2
+
+    def generate(self, seed: str) -> bytes:
+        # The tile grid, one byte per tile in row-major order.
+        gen = MapGen(self.width, self.height, seed)
+        gen.generate(self.min_size, self.max_size)
+        return bytes(gen.map)
+
+
+def unpack_rooms(data: bytes) -> List[Rect]:
+    values = array("i")
+    values.frombytes(data)
+    return [Rect(*values[i : i + 4]) for i in range(0, len(values), 4)]
+
+
+def _generate_chunk(params: Generator, seeds: Sequence[str]) -> List[bytes]:
+    return [params.generate(seed) for seed in seeds]
+
+
+class BatchGenerator:
+    # Generates one dungeon per seed, split into chunks across a process
+    # pool; every generator seeds its own RNG, so results do not depend on
+    # which worker ran them.
+    def __init__(
+        self,
+        params: Generator,
+        workers: int = 0,
+        chunks_per_worker: int = 4,
+    ):
+        self.params: Generator = params
+        self.workers: int = workers
+        self.chunks_per_worker: int = chunks_per_worker
+        self._pool: ChunkedPool = ChunkedPool(workers, chunks_per_worker)
+
+    def __enter__(self) -> "BatchGenerator":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._pool.close()
+
+    def generate(self, seeds: Sequence[str]) -> List[bytes]:
+        if self.workers <= 1 or len(seeds) < 2:
+            return _generate_chunk(self.params, seeds)
+        return self._pool.map(partial(_generate_chunk, self.params), seeds)
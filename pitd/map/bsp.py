@@ -2,207 +2,479 @@ from ..rand import Seed
 from ..math.rect import Rect
 from ..math import math
 
-from dataclasses import dataclass
+from array import array
+import heapq
 import pygame
 import random
-from typing import Self, Tuple
+import struct
+from typing import Dict, Iterator, List, Tuple
+
+NO_NODE: int = -1
+
+# Bits in BSP._flags.
+IS_LEFT: int = 1
+HORIZONTAL: int = 2
+HAS_ROOM: int = 4
+
+# node count, width, height, min node size, max room size, rooms, seed length
+_HEADER = struct.Struct("<IiiiiiI")
+_COLUMNS: Tuple[str, ...] = (
+    "_left",
+    "_right",
+    "_x",
+    "_y",
+    "_w",
+    "_h",
+    "_room_x",
+    "_room_y",
+    "_room_w",
+    "_room_h",
+)
+# Mersenne Twister state after the flags: 624 words plus the position, then
+# whether a cached gauss() value follows and that value.
+_RNG_WORDS: int = 625
+_RNG_TAIL = struct.Struct("<?d")
+
+
+def _box_distance(px: int, py: int, x: int, y: int, w: int, h: int) -> int:
+    # Squared distance from tile (px, py) to the nearest tile of a box.
+    dx = max(x - px, 0, px - (x + w - 1))
+    dy = max(y - py, 0, py - (y + h - 1))
+    return dx * dx + dy * dy
 
 
-@dataclass
 class Node:
-    is_left: bool
-    horizontal: bool
-    width: int
-    height: int
-    left: Self | None
-    right: Self | None
-    root: bool = False
-    room: Rect | None = None
-    _debug_color: Tuple[int, int, int] | None = None
-
-    def _get_debug_color(self) -> Tuple[int, int, int]:
-        if self._debug_color is None:
-            r = int(random.random() * 255)
-            g = int(random.random() * 255)
-            b = int(random.random() * 255)
-            self._debug_color = (r, g, b)
-        return self._debug_color
+    # Lightweight view of one node in a BSP's flat arrays; views are created
+    # on access and compare equal when they refer to the same node.
+    __slots__ = ("bsp", "index")
+
+    def __init__(self, bsp: "BSP", index: int):
+        self.bsp: BSP = bsp
+        self.index: int = index
+
+    def __eq__(self, other: object) -> bool:
+        return (
+            isinstance(other, Node)
+            and other.bsp is self.bsp
+            and other.index == self.index
+        )
+
+    def __hash__(self) -> int:
+        return hash((id(self.bsp), self.index))
+
+    def __repr__(self) -> str:
+        return f"Node({self.index}, {self.x}, {self.y}, {self.width}, {self.height})"
+
+    @property
+    def root(self) -> bool:
+        return self.index == 0
+
+    @property
+    def is_left(self) -> bool:
+        return bool(self.bsp._flags[self.index] & IS_LEFT)
+
+    @property
+    def horizontal(self) -> bool:
+        return bool(self.bsp._flags[self.index] & HORIZONTAL)
+
+    @property
+    def x(self) -> int:
+        return self.bsp._x[self.index]
+
+    @property
+    def y(self) -> int:
+        return self.bsp._y[self.index]
+
+    @property
+    def width(self) -> int:
+        return self.bsp._w[self.index]
+
+    @property
+    def height(self) -> int:
+        return self.bsp._h[self.index]
+
+    @property
+    def left(self) -> "Node | None":
+        return self.bsp.node(self.bsp._left[self.index])
+
+    @property
+    def right(self) -> "Node | None":
+        return self.bsp.node(self.bsp._right[self.index])
+
+    @property
+    def room(self) -> Rect | None:
+        return self.bsp.room(self.index)
 
 
 class BSP:
+    # Nodes live in parallel arrays indexed by node id, with the root at 0;
+    # _left/_right hold child ids (NO_NODE for leaves) and _x/_y the
+    # absolute position of each partition. Rooms are relative to their
+    # partition, as before.
     def __init__(self, width: int, height: int, min_room_size: int, max_room_size: int):
         self.width: int = width
         self.height: int = height
         self.min_node_size: int = min_room_size
         self.max_room_size: int = max_room_size
         self.rooms: int = 0
-        self.root: Node | None = None
+        self.seed: str = ""
+        self._debug_surface: pygame.Surface | None = None
+        # Replaced with generators derived from the seed by generate().
+        self.rng: random.Random = random.Random()
+        self._debug_rng: random.Random = random.Random()
+        self._clear()
 
-    def generate(self, seed: str, max_depth: int) -> None:
-        self.root = Node(False, False, self.width,
-                         self.height, None, None, root=True)
-        random.seed(Seed(seed).get())
-        horizontal = bool(random.getrandbits(1))
-        width, height = 0, 0
-        if horizontal:
-            width = random.randint(self.min_node_size, self.width)
-            self.root.left = Node(True, horizontal, width,
-                                  self.height, None, None)
-            self.root.right = Node(
-                False, horizontal, self.width - width, self.height - height, None, None
-            )
-        else:
-            height = random.randint(self.min_node_size, self.height)
-            self.root.left = Node(
-                True, horizontal, self.width, height, None, None)
-            self.root.right = Node(
-                False, horizontal, self.width, self.height - height, None, None
-            )
+    def _clear(self) -> None:
+        self._left: array = array("i")
+        self._right: array = array("i")
+        self._x: array = array("i")
+        self._y: array = array("i")
+        self._w: array = array("i")
+        self._h: array = array("i")
+        self._flags: bytearray = bytearray()
+        self._room_x: array = array("i")
+        self._room_y: array = array("i")
+        self._room_w: array = array("i")
+        self._room_h: array = array("i")
+        self._debug_colors: Dict[int, Tuple[int, int, int]] = {}
 
-        self._generate(self.root.left, 1, max_depth)
-        self._generate(self.root.right, 1, max_depth)
+    def __len__(self) -> int:
+        return len(self._w)
 
-    def _generate(
-        self,
-        node: Node,
-        depth: int,
-        max_depth: int,
-    ) -> None:
-        if depth >= max_depth:
-            return
+    def to_bytes(self) -> bytes:
+        # The node arrays as-is, so a stored tree loads without regenerating.
+        seed = self.seed.encode("utf-8")
+        parts = [
+            _HEADER.pack(
+                len(self),
+                self.width,
+                self.height,
+                self.min_node_size,
+                self.max_room_size,
+                self.rooms,
+                len(seed),
+            ),
+            seed,
+        ]
+        for name in _COLUMNS:
+            parts.append(getattr(self, name).tobytes())
+        parts.append(bytes(self._flags))
+        # The generation RNG as left by generate(), generate_rooms() and
+        # prune(), so a loaded tree keeps drawing the same numbers.
+        _, state, gauss_next = self.rng.getstate()
+        parts.append(array("I", state).tobytes())
+        parts.append(_RNG_TAIL.pack(gauss_next is not None, gauss_next or 0.0))
+        return b"".join(parts)
 
-        max_width = node.width - self.min_node_size
-        max_height = node.height - self.min_node_size
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "BSP":
+        count, width, height, min_node, max_room, rooms, seed_len = (
+            _HEADER.unpack_from(data)
+        )
+        tree = cls(width, height, min_node, max_room)
+        tree.rooms = rooms
+        offset = _HEADER.size
+        tree.seed = data[offset : offset + seed_len].decode("utf-8")
+        offset += seed_len
+        for name in _COLUMNS:
+            column: array = getattr(tree, name)
+            column.frombytes(data[offset : offset + 4 * count])
+            offset += 4 * count
+        tree._flags[:] = data[offset : offset + count]
+        offset += count
+        state = array("I")
+        state.frombytes(data[offset : offset + 4 * _RNG_WORDS])
+        offset += 4 * _RNG_WORDS
+        if len(tree._flags) != count or len(data) != offset + _RNG_TAIL.size:
+            raise ValueError("truncated BSP data")
+        has_gauss, gauss_next = _RNG_TAIL.unpack_from(data, offset)
+        tree.rng.setstate((3, tuple(state), gauss_next if has_gauss else None))
+        tree._debug_rng = Seed(tree.seed).rng("debug")
+        return tree
 
-        if max_width < self.min_node_size and max_height < self.min_node_size:
-            return
+    @property
+    def root(self) -> Node | None:
+        return Node(self, 0) if self._w else None
+
+    def node(self, index: int) -> Node | None:
+        return None if index == NO_NODE else Node(self, index)
 
-        horizontal = False
+    def is_leaf(self, index: int) -> bool:
+        return self._left[index] == NO_NODE
 
-        if max_width >= self.min_node_size and max_height >= self.min_node_size:
-            horizontal = max_width > max_height
-        elif max_width >= self.min_node_size:
-            horizontal = True
-        elif max_height >= self.min_node_size:
-            horizontal = False
+    def children(self, index: int) -> Tuple[int, int]:
+        return self._left[index], self._right[index]
 
-        next_width, next_height = 0, 0
+    def bounds(self, index: int) -> Tuple[int, int, int, int]:
+        # Absolute (x, y, w, h) of the partition.
+        return self._x[index], self._y[index], self._w[index], self._h[index]
+
+    def room(self, index: int) -> Rect | None:
+        if not self._flags[index] & HAS_ROOM:
+            return None
+        return Rect(
+            self._room_x[index],
+            self._room_y[index],
+            self._room_w[index],
+            self._room_h[index],
+        )
+
+    def _add_node(self, x: int, y: int, width: int, height: int, flags: int) -> int:
+        for column in (self._left, self._right, self._room_x, self._room_y):
+            column.append(NO_NODE)
+        self._room_w.append(0)
+        self._room_h.append(0)
+        self._x.append(x)
+        self._y.append(y)
+        self._w.append(width)
+        self._h.append(height)
+        self._flags.append(flags)
+        return len(self._w) - 1
+
+    def _split(self, index: int, horizontal: bool, size: int) -> None:
+        # Split node index at size along x (horizontal) or y; the right child
+        # takes the remainder.
+        x, y = self._x[index], self._y[index]
+        width, height = self._w[index], self._h[index]
+        flag = HORIZONTAL if horizontal else 0
         if horizontal:
-            next_width = random.randint(self.min_node_size, max_width)
-            next_height = node.height
+            left = self._add_node(x, y, size, height, IS_LEFT | flag)
+            right = self._add_node(x + size, y, width - size, height, flag)
         else:
-            next_width = node.width
-            next_height = random.randint(self.min_node_size, max_height)
+            left = self._add_node(x, y, width, size, IS_LEFT | flag)
+            right = self._add_node(x, y + size, width, height - size, flag)
+        self._left[index] = left
+        self._right[index] = right
 
+    def preorder(self, start: int = 0) -> Iterator[int]:
+        # Node ids depth first, left before right; the order every random
+        # draw is made in, so generation stays reproducible per seed.
+        if not self._w:
+            return
+        left, right = self._left, self._right
+        stack: List[int] = [start]
+        while stack:
+            index = stack.pop()
+            yield index
+            if left[index] != NO_NODE:
+                stack.append(right[index])
+                stack.append(left[index])
+
+    def leaves(self) -> Iterator[int]:
+        left = self._left
+        return (index for index in self.preorder() if left[index] == NO_NODE)
+
+    def room_bounds(self) -> Iterator[Tuple[int, int, int, int]]:
+        # Absolute (x, y, w, h) of every room, in preorder.
+        for index in self.leaves():
+            if self._flags[index] & HAS_ROOM:
+                yield self._room_box(index)
+
+    def _room_box(self, index: int) -> Tuple[int, int, int, int]:
+        return (
+            self._x[index] + self._room_x[index],
+            self._y[index] + self._room_y[index],
+            self._room_w[index],
+            self._room_h[index],
+        )
+
+    def locate(self, x: int, y: int) -> int:
+        # The leaf partition containing (x, y), or NO_NODE outside the map.
+        # Partitions tile their parent exactly, so each level only has to
+        # test the split line of the left child.
+        if not self._w or not (0 <= x < self.width and 0 <= y < self.height):
+            return NO_NODE
+        index = 0
+        left, right = self._left, self._right
+        while left[index] != NO_NODE:
+            child = left[index]
+            if self._flags[child] & HORIZONTAL:
+                inside = x < self._x[child] + self._w[child]
+            else:
+                inside = y < self._y[child] + self._h[child]
+            index = child if inside else right[index]
+        return index
+
+    def room_at(self, x: int, y: int) -> int:
+        # The node whose room contains (x, y), or NO_NODE.
+        index = self.locate(x, y)
+        if index == NO_NODE or not self._flags[index] & HAS_ROOM:
+            return NO_NODE
+        rx, ry, rw, rh = self._room_box(index)
+        if rx <= x < rx + rw and ry <= y < ry + rh:
+            return index
+        return NO_NODE
+
+    def rooms_in(self, x: int, y: int, w: int, h: int) -> List[int]:
+        # Nodes whose rooms overlap the rectangle, in preorder. Subtrees
+        # whose partition misses the rectangle are skipped whole.
+        found: List[int] = []
+        if not self._w or w <= 0 or h <= 0:
+            return found
+        x1, y1 = x + w, y + h
+        left, right = self._left, self._right
+        stack = [0]
+        while stack:
+            index = stack.pop()
+            nx, ny = self._x[index], self._y[index]
+            if not (
+                nx < x1
+                and x < nx + self._w[index]
+                and ny < y1
+                and y < ny + self._h[index]
+            ):
+                continue
+            if left[index] != NO_NODE:
+                stack.append(right[index])
+                stack.append(left[index])
+            elif self._flags[index] & HAS_ROOM:
+                rx, ry, rw, rh = self._room_box(index)
+                if rx < x1 and x < rx + rw and ry < y1 and y < ry + rh:
+                    found.append(index)
+        return found
+
+    def nearest_room(self, x: int, y: int) -> int:
+        # The node whose room is closest to tile (x, y) (0 inside it), or
+        # NO_NODE when there are no rooms. Best-first over partitions: a
+        # partition's distance bounds that of every room inside it.
+        if not self._w:
+            return NO_NODE
+        left, right = self._left, self._right
+        heap: List[Tuple[int, int, bool]] = [(0, 0, False)]
+        while heap:
+            _, index, is_room = heapq.heappop(heap)
+            if is_room:
+                return index
+            if left[index] != NO_NODE:
+                for child in (left[index], right[index]):
+                    distance = _box_distance(x, y, *self.bounds(child))
+                    heapq.heappush(heap, (distance, child, False))
+            elif self._flags[index] & HAS_ROOM:
+                distance = _box_distance(x, y, *self._room_box(index))
+                heapq.heappush(heap, (distance, index, True))
+        return NO_NODE
+
+    def generate(self, seed: str, max_depth: int) -> None:
+        self._debug_surface = None
+        self._clear()
+        self.rooms = 0
+        root = self._add_node(0, 0, self.width, self.height, 0)
+        self.seed = seed
+        tree_seed = Seed(seed)
+        rng = self.rng = tree_seed.rng()
+        self._debug_rng = tree_seed.rng("debug")
+        horizontal = bool(rng.getrandbits(1))
         if horizontal:
-            node.left = Node(True, horizontal, next_width,
-                             node.height, None, None)
-            node.right = Node(
-                False, horizontal, node.width - next_width, node.height, None, None
-            )
+            width = rng.randint(self.min_node_size, self.width)
+            self._split(root, True, width)
         else:
-            node.left = Node(True, horizontal, node.width,
-                             next_height, None, None)
-            node.right = Node(
-                False, horizontal, node.width, node.height - next_height, None, None
-            )
+            height = rng.randint(self.min_node_size, self.height)
+            self._split(root, False, height)
 
-        self._generate(node.left, depth + 1, max_depth)
-        self._generate(node.right, depth + 1, max_depth)
+        min_size = self.min_node_size
+        stack: List[Tuple[int, int]] = [
+            (self._right[root], 1),
+            (self._left[root], 1),
+        ]
+        while stack:
+            index, depth = stack.pop()
+            if depth >= max_depth:
+                continue
+
+            max_width = self._w[index] - min_size
+            max_height = self._h[index] - min_size
+
+            if max_width < min_size and max_height < min_size:
+                continue
+
+            if max_width >= min_size and max_height >= min_size:
+                horizontal = max_width > max_height
+            else:
+                horizontal = max_width >= min_size
+
+            if horizontal:
+                size = rng.randint(min_size, max_width)
+            else:
+                size = rng.randint(min_size, max_height)
+            self._split(index, horizontal, size)
+
+            stack.append((self._right[index], depth + 1))
+            stack.append((self._left[index], depth + 1))
 
     def generate_rooms(
         self, min_size: Tuple[int, int], max_size: Tuple[int, int]
     ) -> None:
         self.min_width, self.min_height = min_size
         self.max_width, self.max_height = max_size
-        if self.root is not None:
-            self._generate_rooms(self.root.left)
-            self._generate_rooms(self.root.right)
-
-    def _generate_rooms(self, node: Node | None) -> None:
-        if node is not None:
-            if node.left is None and node.right is None:
-                if node.width > self.min_width and node.height > self.min_height:
-                    width = math.clamp(
-                        random.randint(self.min_width, self.max_width),
-                        self.min_width,
-                        node.width,
-                    )
-                    height = math.clamp(
-                        random.randint(self.min_height, self.max_width),
-                        self.min_height,
-                        node.height,
-                    )
-                    x = random.randint(0, abs(node.width - width))
-                    y = random.randint(0, abs(node.height - height))
-                    node.room = Rect(x, y, width, height)
-                    self.rooms += 1
-            else:
-                self._generate_rooms(node.left)
-                self._generate_rooms(node.right)
+        self._debug_surface = None
+        for index in self.leaves():
+            node_width, node_height = self._w[index], self._h[index]
+            if node_width > self.min_width and node_height > self.min_height:
+                width = math.clamp(
+                    self.rng.randint(self.min_width, self.max_width),
+                    self.min_width,
+                    node_width,
+                )
+                height = math.clamp(
+                    self.rng.randint(self.min_height, self.max_width),
+                    self.min_height,
+                    node_height,
+                )
+                self._room_x[index] = self.rng.randint(0, abs(node_width - width))
+                self._room_y[index] = self.rng.randint(0, abs(node_height - height))
+                self._room_w[index] = width
+                self._room_h[index] = height
+                self._flags[index] |= HAS_ROOM
+                self.rooms += 1
 
     def prune(self, max_rooms: int) -> None:
-        if self.rooms > max_rooms:
-            while self.rooms > max_rooms:
-                _ = self._prune(self.root, max_rooms)
-
-    def _prune(self, node: Node | None, max_rooms: int) -> bool:
-        if self.rooms <= max_rooms:
-            return False
-
-        if node is not None:
-            if node.left is None and node.right is None:
-                if node.room is not None:
-                    if bool(random.getrandbits(1)):
-                        self.rooms -= 1
-                        node.room = None
-                        return True
+        # Drop a seeded random sample of rooms so that at most max_rooms are
+        # left, in one pass over the leaves.
+        rooms = [index for index in self.leaves() if self._flags[index] & HAS_ROOM]
+        excess = len(rooms) - max(0, max_rooms)
+        if excess <= 0:
+            return
+        self._debug_surface = None
+        for index in self.rng.sample(rooms, excess):
+            self._flags[index] &= ~HAS_ROOM
+        self.rooms = len(rooms) - excess
 
-            if self._prune(node.left, max_rooms):
-                self.left = None
-            if self._prune(node.right, max_rooms):
-                self.right = None
+    def debug_render(self, surface: pygame.Surface) -> None:
+        surface.blit(self.debug_surface(), (0, 0))
 
-        return False
+    def debug_surface(self) -> pygame.Surface:
+        # The tree is fixed between generate/generate_rooms/prune calls, so it
+        # is rasterised once and reused for every frame.
+        if self._debug_surface is None:
+            self._debug_surface = pygame.Surface((self.width, self.height))
+            for index in self.preorder():
+                if index != 0:
+                    self._debug_render(self._debug_surface, index)
+        return self._debug_surface
 
-    def debug_render(self, surface: pygame.Surface) -> None:
-        if self.root is not None:
-            self._debug_render(surface, self.root.left, self.root.right, 0, 0)
-            self._debug_render(surface, self.root.right, self.root.left, 0, 0)
-
-    def _debug_render(
-        self,
-        surface: pygame.Surface,
-        node: Node | None,
-        other: Node | None,
-        x: int,
-        y: int,
-    ) -> None:
-        if node is not None and other is not None:
-            if not node.is_left and node.horizontal:
-                x += other.width
-            elif not node.is_left and not node.horizontal:
-                y += other.height
+    def _debug_color(self, index: int) -> Tuple[int, int, int]:
+        color = self._debug_colors.get(index)
+        if color is None:
+            r = int(self._debug_rng.random() * 255)
+            g = int(self._debug_rng.random() * 255)
+            b = int(self._debug_rng.random() * 255)
+            color = self._debug_colors[index] = (r, g, b)
+        return color
 
+    def _debug_render(self, surface: pygame.Surface, index: int) -> None:
+        x, y = self._x[index], self._y[index]
+        color = self._debug_color(index)
+        pygame.draw.rect(
+            surface, color, (x, y, self._w[index], self._h[index]), width=2
+        )
+        if self._flags[index] & HAS_ROOM:
             pygame.draw.rect(
                 surface,
-                node._get_debug_color(),
-                (x, y, node.width, node.height),
-                width=2,
+                color,
+                (
+                    x + self._room_x[index],
+                    y + self._room_y[index],
+                    self._room_w[index],
+                    self._room_h[index],
+                ),
             )
-
-            if node.room is not None:
-                pygame.draw.rect(
-                    surface,
-                    node._get_debug_color(),
-                    (
-                        x + node.room.x,
-                        y + node.room.y,
-                        node.room.w,
-                        node.room.h,
-                    ),
-                )
-
-            self._debug_render(surface, node.left, node.right, x, y)
-            self._debug_render(surface, node.right, node.left, x, y)
-            self._debug_render(surface, node.right, node.left, x, y)
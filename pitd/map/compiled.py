@@ -0,0 +1,248 @@
+import hashlib
+import json
+import mmap
+import os
+import shutil
+import struct
+import tempfile
+from typing import IO, Any, BinaryIO, Dict, NamedTuple, Tuple
+
+from .atomic import atomic_write
+from .mapfile import MapData, MapParser, ProgressFunc
+from .tiles import TileStore, TileType
+
+__all__ = [
+    "MapLayout",
+    "compile_map",
+    "compiled_path",
+    "ensure_compiled",
+    "load_map",
+    "map_data",
+    "open_compiled",
+    "read_layout",
+]
+
+_MAGIC: bytes = b"PITDMAP\0"
+_VERSION: int = 1
+# magic, version, source mtime (ns), source size, source sha256,
+# metadata length, width, height
+_HEADER = struct.Struct("<8sHqq32sIII")
+_MTIME_OFFSET: int = struct.calcsize("<8sH")
+
+
+def compiled_path(source: str) -> str:
+    return source + "c"
+
+
+def _hash_file(filename: str) -> bytes:
+    digest = hashlib.sha256()
+    with open(filename, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.digest()
+
+
+class _PlaneWriter(TileStore):
+    # Receives parsed rows and spools each plane to its own temporary file,
+    # so compiling never holds more than one row of the map in memory.
+    def __init__(self) -> None:
+        super().__init__()
+        self.planes: Tuple[IO[bytes], IO[bytes], IO[bytes]] = (
+            tempfile.TemporaryFile(),
+            tempfile.TemporaryFile(),
+            tempfile.TemporaryFile(),
+        )
+
+    def close(self) -> None:
+        for plane in self.planes:
+            plane.close()
+
+    def append_row(self, types: bytes, glyphs: bytes, flags: bytes) -> None:
+        if not self.width:
+            self.width = len(types)
+        if len(types) > self.width:
+            raise ValueError(
+                f"row {self.height} has {len(types)} tiles, map is {self.width} wide"
+            )
+        pad = self.width - len(types)
+        type_plane, glyph_plane, flag_plane = self.planes
+        type_plane.write(types)
+        type_plane.write(bytes([TileType.EMPTY]) * pad)
+        glyph_plane.write(glyphs)
+        glyph_plane.write(bytes(pad))
+        flag_plane.write(flags)
+        flag_plane.write(bytes(pad))
+        self.height += 1
+
+
+def _write(
+    f: BinaryIO,
+    data: MapData,
+    planes: _PlaneWriter,
+    stat: os.stat_result,
+    digest: bytes,
+) -> None:
+    meta = json.dumps(
+        {
+            "glyphs": planes.glyph_chars,
+            "size": data.size,
+            "player_pos": data.player_pos,
+            "player_str": data.player_str,
+            "info": data.info,
+            "tile_data": data.tile_data,
+            "chars": sorted(data.chars),
+        }
+    ).encode("utf-8")
+    f.write(
+        _HEADER.pack(
+            _MAGIC,
+            _VERSION,
+            stat.st_mtime_ns,
+            stat.st_size,
+            digest,
+            len(meta),
+            planes.width,
+            planes.height,
+        )
+    )
+    f.write(meta)
+    for plane in planes.planes:
+        plane.seek(0)
+        shutil.copyfileobj(plane, f, 1 << 16)
+
+
+def compile_map(
+    source: str, target: str | None = None, progress: ProgressFunc | None = None
+) -> str:
+    target = target or compiled_path(source)
+    stat = os.stat(source)
+    digest = _hash_file(source)
+    planes = _PlaneWriter()
+    try:
+        data = MapParser(tiles=planes).parse_file(source, progress).data()
+        with atomic_write(target) as f:
+            _write(f, data, planes, stat, digest)
+    finally:
+        planes.close()
+    return target
+
+
+def _read_header(filename: str) -> Tuple | None:
+    try:
+        with open(filename, "rb") as f:
+            header = f.read(_HEADER.size)
+    except OSError:
+        return None
+    if len(header) != _HEADER.size:
+        return None
+    fields = _HEADER.unpack(header)
+    if fields[0] != _MAGIC or fields[1] != _VERSION:
+        return None
+    return fields
+
+
+class MapLayout(NamedTuple):
+    width: int
+    height: int
+    # File offset of the type plane; glyphs and flags follow it directly.
+    offset: int
+    meta: Dict[str, Any]
+
+
+def read_layout(filename: str) -> MapLayout:
+    header = _read_header(filename)
+    if header is None:
+        raise ValueError(f"{filename} is not a compiled map")
+    _, _, _, _, _, meta_len, width, height = header
+    with open(filename, "rb") as f:
+        f.seek(_HEADER.size)
+        meta = json.loads(f.read(meta_len))
+        offset = f.tell()
+        end = f.seek(0, os.SEEK_END)
+    if end != offset + 3 * width * height:
+        raise ValueError(f"{filename} is truncated")
+    return MapLayout(width, height, offset, meta)
+
+
+def map_data(layout: MapLayout, tiles: TileStore) -> MapData:
+    meta = layout.meta
+    size_w, size_h = meta["size"] or (0, 0)
+    player_x, player_y = meta["player_pos"]
+    return MapData(
+        tiles,
+        (size_w, size_h) if meta["size"] else None,
+        (player_x, player_y),
+        meta["player_str"],
+        meta["info"],
+        meta["tile_data"],
+        set(meta["chars"]),
+    )
+
+
+def open_compiled(filename: str) -> MapData:
+    layout = read_layout(filename)
+    with open(filename, "rb") as f:
+        # A private mapping shares pages with every other process mapping the
+        # same file until a tile is written, which then copies only that page.
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+    view = memoryview(mapped)
+    size = layout.width * layout.height
+    start = layout.offset
+    tiles = TileStore.from_buffers(
+        layout.width,
+        layout.height,
+        view[start : start + size],
+        view[start + size : start + 2 * size],
+        view[start + 2 * size : start + 3 * size],
+        layout.meta["glyphs"],
+    )
+    return map_data(layout, tiles)
+
+
+def _is_fresh(source: str, target: str) -> bool:
+    header = _read_header(target)
+    if header is None:
+        return False
+    # A valid header over a truncated body or damaged metadata (an
+    # interrupted copy, a full disk) is rebuilt rather than loaded.
+    try:
+        read_layout(target)
+    except ValueError:
+        return False
+    _, _, mtime_ns, size, digest, _, _, _ = header
+    stat = os.stat(source)
+    if stat.st_size != size:
+        return False
+    if stat.st_mtime_ns == mtime_ns:
+        return True
+    if _hash_file(source) != digest:
+        return False
+    # The source was touched but not changed; record the new mtime so the
+    # next load does not hash it again.
+    try:
+        with open(target, "r+b") as f:
+            f.seek(_MTIME_OFFSET)
+            f.write(struct.pack("<q", stat.st_mtime_ns))
+    except OSError:
+        pass
+    return True
+
+
+def ensure_compiled(source: str, progress: ProgressFunc | None = None) -> str:
+    target = compiled_path(source)
+    if not _is_fresh(source, target):
+        compile_map(source, target, progress)
+    return target
+
+
+def load_map(
+    source: str, progress: ProgressFunc | None = None, use_cache: bool = True
+) -> MapData:
+    if not use_cache:
+        return MapParser().parse_file(source, progress).data()
+    try:
+        target = ensure_compiled(source, progress)
+    except OSError:
+        # Read-only install locations simply go without the cache.
+        return MapParser().parse_file(source, progress).data()
+    return open_compiled(target)
@@ -0,0 +1,96 @@
+import hashlib
+import json
+import os
+from typing import List, Tuple
+
+from ..rand import Seed
+from .atomic import atomic_write
+from .batch import Generator
+
+__all__ = ["LayoutCache"]
+
+_SUFFIX: str = ".layout"
+
+
+class LayoutCache:
+    # Generated layouts on disk, one file per (generator, version, params,
+    # seed hash). Files are shared between processes; the least recently
+    # used ones are deleted once the directory grows past max_bytes.
+    def __init__(self, directory: str, max_bytes: int = 64 << 20):
+        self.directory: str = directory
+        self.max_bytes: int = max_bytes
+        self.hits: int = 0
+        self.misses: int = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, params: Generator, seed: str) -> str:
+        description = json.dumps(
+            [
+                type(params).__name__,
+                params.version,
+                vars(params),
+                Seed(seed).get(),
+            ],
+            sort_keys=True,
+        )
+        return hashlib.sha256(description.encode("utf-8")).hexdigest()
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, key + _SUFFIX)
+
+    def get(self, key: str) -> bytes | None:
+        path = self.path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            # Reads refresh the mtime, which eviction treats as last use.
+            os.utime(path)
+        except OSError:
+            return None
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        with atomic_write(self.path(key)) as f:
+            f.write(data)
+        self._evict()
+
+    def fetch(self, params: Generator, seed: str) -> bytes:
+        key = self.key(params, seed)
+        data = self.get(key)
+        if data is not None:
+            self.hits += 1
+            return data
+        self.misses += 1
+        data = params.generate(seed)
+        self.put(key, data)
+        return data
+
+    def entries(self) -> List[Tuple[float, int, str]]:
+        # (mtime, size, path) of every cached layout, oldest first.
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if not entry.name.endswith(_SUFFIX):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        entries.sort()
+        return entries
+
+    def size(self) -> int:
+        return sum(size for _, size, _ in self.entries())
+
+    def _evict(self) -> None:
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+            total -= size
@@ -1,14 +1,65 @@
 from ..rand import Seed
 from ..math.rect import Rect
 
-from typing import List
+from typing import Iterator, List, Tuple
 
 import pygame
 import random
 
 
-def _random_offset(min: int, max: int) -> int:
-    return random.randint(min, max)
+# Debug colours indexed by tile value.
+_DEBUG_PALETTE: List[Tuple[int, int, int]] = [(255, 0, 0), (255, 255, 255)]
+
+
+class _RectGrid:
+    # Uniform grid of buckets over the map. Each placed rect is listed, in
+    # placement order, in every bucket its padded bounds touch, so a query
+    # only looks at rects near the candidate.
+    def __init__(self, width: int, height: int, cell: int, padding: int = 1):
+        self.cell: int = max(1, cell)
+        self.padding: int = padding
+        self.cols: int = width // self.cell + 2
+        self.rows: int = height // self.cell + 2
+        self.buckets: List[List[int]] = [[] for _ in range(self.cols * self.rows)]
+        self.rects: List[Rect] = []
+        # Padded bounds as (x0, y0, x1, y1), matching Rect.collides_near.
+        self.bounds: List[Tuple[int, int, int, int]] = []
+
+    def _cells(self, x0: int, y0: int, x1: int, y1: int) -> Iterator[int]:
+        cell = self.cell
+        cx0, cy0 = max(0, x0 // cell), max(0, y0 // cell)
+        cx1 = min(self.cols - 1, max(x0, x1 - 1) // cell)
+        cy1 = min(self.rows - 1, max(y0, y1 - 1) // cell)
+        for cy in range(cy0, cy1 + 1):
+            row = cy * self.cols
+            for cx in range(cx0, cx1 + 1):
+                yield row + cx
+
+    def add(self, rect: Rect) -> None:
+        pad = self.padding
+        x0, y0 = max(0, rect.x - pad), max(0, rect.y - pad)
+        bounds = (x0, y0, x0 + rect.w + pad * 2, y0 + rect.h + pad * 2)
+        index = len(self.rects)
+        self.rects.append(rect)
+        self.bounds.append(bounds)
+        for cell in self._cells(*bounds):
+            self.buckets[cell].append(index)
+
+    def first_near(self, other: Rect) -> Rect | None:
+        # The earliest placed rect whose padded bounds overlap other.
+        ox0, oy0 = other.x, other.y
+        ox1, oy1 = ox0 + other.w, oy0 + other.h
+        bounds = self.bounds
+        first = len(self.rects)
+        for cell in self._cells(ox0, oy0, ox1, oy1):
+            for index in self.buckets[cell]:
+                if index >= first:
+                    break
+                x0, y0, x1, y1 = bounds[index]
+                if x0 < ox1 and x1 > ox0 and y0 < oy1 and y1 > oy0:
+                    first = index
+                    break
+        return self.rects[first] if first < len(self.rects) else None
 
 
 class MapGen:
@@ -16,57 +67,79 @@ class MapGen:
         self.map_width = map_width
         self.map_height = map_height
         self.map_seed = Seed(map_seed)
-        self.map = [[0 for x in range(self.map_width)]
-                    for y in range(self.map_height)]
+        self.rng: random.Random = self.map_seed.rng()
+        # Row-major, one byte per tile: 0 for solid, 1 for room.
+        self.map: bytearray = bytearray(self.map_width * self.map_height)
+        self._debug_surface: pygame.Surface | None = None
 
     def generate(self, min_size: int, max_size: int) -> None:
-        random.seed(self.map_seed.get())
+        self.rng = rng = self.map_seed.rng()
+        self._debug_surface = None
         rects: List[Rect] = []
-        should_create = 0
-        for y in range(1, self.map_height - 1):
-            for x in range(1, self.map_width - 1):
-                should_create = max(0, should_create - 1)
-                if should_create == 0:
-                    new_rect = self._create_random_rect(
-                        x, y + _random_offset(0, 2), min_size, max_size
-                    )
-                    if not new_rect.is_out_of_bounds(self.map_width, self.map_width):
-                        found = False
-                        for rect in rects:
-                            if rect.collides_near(new_rect):
-                                found = True
-                                should_create = rect.w + _random_offset(2, 3)
-                                break
-                        if not found:
-                            rects.append(new_rect)
-                            should_create = new_rect.w + _random_offset(3, 5)
+        placed = _RectGrid(self.map_width, self.map_height, max_size + 2)
+        # Candidates are tried along the interior cells in row-major order;
+        # each attempt sets how many cells to skip before the next one.
+        inner_w = self.map_width - 2
+        cells = inner_w * (self.map_height - 2) if inner_w > 0 else 0
+        pos = 0
+        while pos < cells:
+            x, y = 1 + pos % inner_w, 1 + pos // inner_w
+            pos += 1
+            new_rect = self._create_random_rect(
+                x, y + rng.randint(0, 2), min_size, max_size
+            )
+            if not new_rect.is_out_of_bounds(self.map_width, self.map_height):
+                hit = placed.first_near(new_rect)
+                if hit is not None:
+                    pos += hit.w + rng.randint(2, 3) - 1
+                else:
+                    rects.append(new_rect)
+                    placed.add(new_rect)
+                    pos += new_rect.w + rng.randint(3, 5) - 1
 
         for rect in rects:
-            if bool(random.getrandbits(1)):
+            if bool(rng.getrandbits(1)):
                 self._apply_rect(rect)
 
+    def load_grid(self, data: bytes) -> None:
+        # Restore a grid previously packed one byte per tile, row-major.
+        if len(data) != self.map_width * self.map_height:
+            raise ValueError("grid size does not match the map")
+        self.map[:] = data
+        self._debug_surface = None
+
+    def tile(self, x: int, y: int) -> int:
+        return self.map[y * self.map_width + x]
+
     def _create_random_rect(self, x: int, y: int, min_size: int, max_size: int) -> Rect:
-        width = random.randint(min_size, max_size)
-        height = random.randint(min_size, max_size)
+        width = self.rng.randint(min_size, max_size)
+        height = self.rng.randint(min_size, max_size)
         return Rect(x, y, width, height)
 
     def _apply_rect(self, rect: Rect) -> None:
-        for y in range(rect.y, rect.y + rect.h):
-            for x in range(rect.x, rect.x + rect.w):
-                self.map[y][x] = 1
+        x0, x1 = max(0, rect.x), min(self.map_width, rect.x + rect.w)
+        if x0 >= x1:
+            return
+        row = b"\x01" * (x1 - x0)
+        for y in range(max(0, rect.y), min(self.map_height, rect.y + rect.h)):
+            start = y * self.map_width
+            self.map[start + x0 : start + x1] = row
 
     def _debug_render(self, surface: pygame.Surface, tile_size: int) -> None:
-        for y in range(self.map_height):
-            for x in range(self.map_width):
-                if self.map[y][x] == 0:
-                    pygame.draw.rect(
-                        surface,
-                        (255, 0, 0),
-                        (x * tile_size, y * tile_size, tile_size, tile_size),
-                    )
-                else:
-                    pygame.draw.rect(
-                        surface,
-                        (255, 255, 255),
-                        (x * tile_size, y * tile_size, tile_size, tile_size),
-                    )
+        surface.blit(self.debug_surface(tile_size), (0, 0))
+
+    def debug_surface(self, tile_size: int) -> pygame.Surface:
+        # The grid only changes in generate/load_grid, so it is turned into
+        # an 8-bit surface in one go (the tile values index the palette),
+        # scaled up and kept until then.
+        cached = self._debug_surface
+        if cached is None or cached.get_width() != self.map_width * tile_size:
+            image = pygame.image.frombytes(
+                bytes(self.map), (self.map_width, self.map_height), "P"
+            )
+            image.set_palette(_DEBUG_PALETTE)
+            cached = pygame.transform.scale(
+                image, (self.map_width * tile_size, self.map_height * tile_size)
+            )
+            self._debug_surface = cached
+        return cached
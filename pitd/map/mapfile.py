@@ -0,0 +1,171 @@
+import os
+from dataclasses import dataclass, field
+from typing import BinaryIO, Callable, Dict, Set, Tuple
+
+from .tiles import FLAG_PLAYER, FLAG_VISIBLE, TileStore, TileType
+
+__all__ = ["MapData", "MapParser", "ProgressFunc"]
+
+# Called with (bytes read, total bytes); total is 0 when it is not known.
+ProgressFunc = Callable[[int, int], None]
+
+_SECTIONS: Dict[bytes, str] = {
+    b"[mapinfo]": "info",
+    b"[defs]": "defs",
+    b"[map]": "map",
+}
+
+
+@dataclass
+class MapData:
+    tiles: TileStore
+    size: Tuple[int, int] | None = None
+    player_pos: Tuple[int, int] = (0, 0)
+    player_str: str = "@"
+    info: Dict[str, str] = field(default_factory=dict)
+    tile_data: Dict[str, str] = field(default_factory=dict)
+    chars: Set[str] = field(default_factory=set)
+
+
+class MapParser:
+    def __init__(self, progress_rows: int = 256, tiles: TileStore | None = None):
+        self.progress_rows: int = progress_rows
+        self.info: Dict[str, str] = {}
+        self.tile_data: Dict[str, str] = {}
+        self.chars: Set[str] = set()
+        # Rows are appended to tiles as they are read; a TileStore subclass
+        # can send them elsewhere instead of keeping them in memory.
+        self.tiles: TileStore = tiles if tiles is not None else TileStore()
+        self.size: Tuple[int, int] | None = None
+        self.player_pos: Tuple[int, int] = (0, 0)
+        self.player_str: str = "@"
+        self._mode: str = ""
+        self._tables: Tuple[bytes, bytes, bytes] | None = None
+        self._player: bytes | None = None
+        self._handlers: Dict[str, Callable[[bytes], None]] = {
+            "info": self._read_info,
+            "defs": self._read_defs,
+            "map": self._read_map,
+        }
+
+    def parse_file(self, filename: str, progress: ProgressFunc | None = None) -> "MapParser":
+        with open(filename, "rb") as f:
+            self.parse(f, os.fstat(f.fileno()).st_size, progress)
+        return self
+
+    def data(self) -> MapData:
+        return MapData(
+            self.tiles,
+            self.size,
+            self.player_pos,
+            self.player_str,
+            self.info,
+            self.tile_data,
+            self.chars,
+        )
+
+    def parse(
+        self, f: BinaryIO, total: int = 0, progress: ProgressFunc | None = None
+    ) -> None:
+        done = 0
+        next_report = self.progress_rows
+        for raw in f:
+            done += len(raw)
+            self.feed(raw)
+            if progress is not None and self.tiles.height >= next_report:
+                progress(done, total)
+                next_report = self.tiles.height + self.progress_rows
+        if progress is not None:
+            progress(done, total)
+
+    def feed(self, raw: bytes) -> None:
+        line = raw.strip()
+        if not line:
+            return
+        if line[:1] == b"[":
+            mode = _SECTIONS.get(line)
+            if mode is not None:
+                self._mode = mode
+                return
+            if line.startswith(b"[/"):
+                self._mode = ""
+                return
+        handler = self._handlers.get(self._mode)
+        if handler is not None:
+            handler(line)
+
+    def _read_info(self, line: bytes) -> None:
+        split = line.decode("utf-8").split("=")
+        if len(split) == 2:
+            name, value = split
+            self.info[name] = value
+            if name == "size":
+                dims = value.split(",")
+                self.size = int(dims[0]), int(dims[1])
+                if not self.tiles.height:
+                    self.tiles.width = self.size[0]
+
+    def _read_defs(self, line: bytes) -> None:
+        split = line.decode("utf-8").split("=")
+        if len(split) == 2:
+            name, value = split
+            self.tile_data[value] = name
+            self._tables = None
+
+    def _read_map(self, line: bytes) -> None:
+        if not line.isascii():
+            self._read_map_slow(line.decode("utf-8"))
+            return
+        types, glyphs, flags = self._get_tables()
+        self.chars.update(line.decode("ascii"))
+        if self._player is not None:
+            x = line.rfind(self._player)
+            if x >= 0:
+                self.player_pos = x, self.tiles.height
+                self.player_str = self._player.decode("ascii")
+        self.tiles.append_row(
+            line.translate(types), line.translate(glyphs), line.translate(flags)
+        )
+
+    def _read_map_slow(self, line: str) -> None:
+        types = bytearray()
+        glyphs = bytearray()
+        flags = bytearray()
+        y = self.tiles.height
+        for x, c in enumerate(line):
+            self.chars.add(c)
+            tile_type, glyph, flag = self._classify(c)
+            if flag & FLAG_PLAYER:
+                self.player_pos = x, y
+                self.player_str = c
+            types.append(tile_type)
+            glyphs.append(glyph)
+            flags.append(flag)
+        self.tiles.append_row(types, glyphs, flags)
+
+    def _classify(self, c: str) -> Tuple[int, int, int]:
+        data = self.tile_data.get(c)
+        if data == "player":
+            return TileType.FLOOR, self.tiles.glyph_code("."), FLAG_PLAYER | FLAG_VISIBLE
+        if data == "floor":
+            return TileType.FLOOR, self.tiles.glyph_code(c), FLAG_VISIBLE
+        if data == "wall":
+            return TileType.WALL, self.tiles.glyph_code(c), FLAG_VISIBLE
+        return TileType.EMPTY, 0, 0
+
+    def _get_tables(self) -> Tuple[bytes, bytes, bytes]:
+        # Per-byte lookup tables so a whole row converts with three
+        # bytes.translate calls.
+        if self._tables is None:
+            types = bytearray([TileType.EMPTY]) * 256
+            glyphs = bytearray(256)
+            flags = bytearray(256)
+            self._player = None
+            for c, name in self.tile_data.items():
+                if len(c) == 1 and c.isascii():
+                    code = ord(c)
+                    types[code], glyphs[code], flags[code] = self._classify(c)
+                    if name == "player":
+                        self._player = c.encode("ascii")
+            self._tables = bytes(types), bytes(glyphs), bytes(flags)
+        return self._tables
@@ -0,0 +1,190 @@
+import io
+import os
+from collections import OrderedDict
+from typing import Any, Dict, List, Set, Tuple
+
+from .compiled import MapLayout, ensure_compiled, map_data, read_layout
+from .mapfile import ProgressFunc
+from .tiles import TILE_SIZE, TileStore, TileType, TileView
+
+__all__ = ["PagedMap"]
+
+Region = Tuple[int, int]
+
+# Tile fields stored in the compiled file. Edits to these pin their region;
+# everything else (the player and visibility flags) lives in an overlay.
+_PERSISTED: Set[str] = {"tile_type", "c"}
+
+
+class PagedMap:
+    def __init__(
+        self,
+        game_dir: str,
+        filename: str,
+        region_size: int = 64,
+        max_regions: int = 64,
+    ):
+        if region_size < 1 or max_regions < 1:
+            raise ValueError("region_size and max_regions must be positive")
+        self.game_dir: str = game_dir
+        self.filename: str = ""
+        self.region_size: int = region_size
+        self.max_regions: int = max_regions
+        self.width: int = -1
+        self.height: int = -1
+        self.should_update_surface: bool = True
+        self.tile_data: dict = {}
+        self.chars: set = set()
+        self.player_pos: Tuple[int, int] = (0, 0)
+        self.player_str: str = "@"
+        self.revision: int = 0
+        self.loads: int = 0
+        self.evictions: int = 0
+        self._layout: MapLayout | None = None
+        self._file: io.BufferedReader | None = None
+        self._regions: OrderedDict[Region, TileStore] = OrderedDict()
+        self._transparency: Dict[Region, bytearray] = {}
+        # Regions with in-memory edits are never evicted, since the compiled
+        # file they would be reloaded from does not have those edits.
+        self._pinned: Set[Region] = set()
+        # (x, y) -> (flags in the compiled file, current flags) for tiles
+        # whose flags were changed; reapplied whenever a region is loaded.
+        self._flags: Dict[Tuple[int, int], Tuple[int, int]] = {}
+        self.parse(os.path.join(self.game_dir, filename))
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def parse(self, filename: str, progress: ProgressFunc | None = None) -> None:
+        self.close()
+        self.filename = os.path.join(self.game_dir, filename)
+        self.revision += 1
+        self._regions.clear()
+        self._transparency.clear()
+        self._pinned.clear()
+        self._flags.clear()
+        compiled = ensure_compiled(self.filename, progress)
+        self._layout = read_layout(compiled)
+        self._file = open(compiled, "rb")
+        data = map_data(self._layout, TileStore())
+        self.tile_data.update(data.tile_data)
+        self.chars.update(data.chars)
+        self.player_pos = data.player_pos
+        self.player_str = data.player_str
+        if data.size is not None:
+            width, height = data.size[0] * TILE_SIZE, data.size[1] * TILE_SIZE
+            self.should_update_surface = self.width != width and self.height != height
+            self.width, self.height = width, height
+
+    @property
+    def cols(self) -> int:
+        return self._layout.width if self._layout is not None else 0
+
+    @property
+    def rows(self) -> int:
+        return self._layout.height if self._layout is not None else 0
+
+    @property
+    def glyph_chars(self) -> List[str]:
+        return self._layout.meta["glyphs"] if self._layout is not None else [" "]
+
+    @property
+    def resident_regions(self) -> int:
+        return len(self._regions)
+
+    def in_bounds(self, x: int, y: int) -> bool:
+        return 0 <= x < self.cols and 0 <= y < self.rows
+
+    def tile(self, x: int, y: int) -> TileView:
+        if not self.in_bounds(x, y):
+            raise IndexError((x, y))
+        size = self.region_size
+        return self.region(x // size, y // size).tile(x % size, y % size)
+
+    def type_at(self, x: int, y: int) -> TileType:
+        return self.tile(x, y).tile_type
+
+    def set(self, x: int, y: int, key: str, value: Any) -> None:
+        tile = self.tile(x, y)
+        if key in _PERSISTED:
+            setattr(tile, key, value)
+            region = x // self.region_size, y // self.region_size
+            self._pinned.add(region)
+            if key == "tile_type":
+                self._transparency.pop(region, None)
+                self.revision += 1
+            return
+        flags = tile.store.flags
+        original = self._flags.get((x, y), (flags[tile.index], 0))[0]
+        setattr(tile, key, value)
+        if flags[tile.index] == original:
+            self._flags.pop((x, y), None)
+        else:
+            self._flags[x, y] = (original, flags[tile.index])
+
+    def transparency_window(self, x0: int, y0: int, w: int, h: int) -> bytes:
+        size = self.region_size
+        out = bytearray()
+        for y in range(y0, y0 + h):
+            ry, ly = divmod(y, size)
+            x = x0
+            while x < x0 + w:
+                rx, lx = divmod(x, size)
+                region = self.region(rx, ry)
+                take = min(region.width - lx, x0 + w - x)
+                start = ly * region.width + lx
+                out += self._region_transparency(rx, ry)[start : start + take]
+                x += take
+        return bytes(out)
+
+    def region(self, rx: int, ry: int) -> TileStore:
+        key = rx, ry
+        tiles = self._regions.get(key)
+        if tiles is not None:
+            self._regions.move_to_end(key)
+            return tiles
+        tiles = self._regions[key] = self._load(rx, ry)
+        self._evict()
+        return tiles
+
+    def _region_transparency(self, rx: int, ry: int) -> bytearray:
+        grid = self._transparency.get((rx, ry))
+        if grid is None:
+            grid = self._transparency[rx, ry] = self.region(rx, ry).transparency()
+        return grid
+
+    def _evict(self) -> None:
+        for key in list(self._regions):
+            if len(self._regions) <= self.max_regions:
+                break
+            if key in self._pinned:
+                continue
+            del self._regions[key]
+            self._transparency.pop(key, None)
+            self.evictions += 1
+
+    def _load(self, rx: int, ry: int) -> TileStore:
+        assert self._layout is not None and self._file is not None
+        width, height, offset, meta = self._layout
+        x0, y0 = rx * self.region_size, ry * self.region_size
+        if not (0 <= x0 < width and 0 <= y0 < height):
+            raise IndexError((rx, ry))
+        w = min(self.region_size, width - x0)
+        h = min(self.region_size, height - y0)
+        planes: List[bytearray] = []
+        for plane in range(3):
+            buf = bytearray(w * h)
+            view = memoryview(buf)
+            base = offset + plane * width * height
+            for row in range(h):
+                self._file.seek(base + (y0 + row) * width + x0)
+                self._file.readinto(view[row * w : (row + 1) * w])
+            planes.append(buf)
+        self.loads += 1
+        types, glyphs, flags = planes
+        for (x, y), (_, value) in self._flags.items():
+            if x0 <= x < x0 + w and y0 <= y < y0 + h:
+                flags[(y - y0) * w + x - x0] = value
+        return TileStore.from_buffers(w, h, types, glyphs, flags, meta["glyphs"])
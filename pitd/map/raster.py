@@ -0,0 +1,100 @@
+from typing import List, Tuple
+
+from .bsp import BSP, NO_NODE
+from .mapfile import MapData
+from .tiles import FLAG_PLAYER, TileStore, TileType
+
+__all__ = ["rasterize", "rasterize_types", "to_map_data"]
+
+FLOOR_CHAR: str = "."
+WALL_CHAR: str = "#"
+PLAYER_CHAR: str = "@"
+
+_FLOOR: int = TileType.FLOOR
+_WALL: int = TileType.WALL
+# Glyph codes in the TileStore built below: 0 is the store's blank glyph.
+_GLYPHS: List[str] = [" ", WALL_CHAR, FLOOR_CHAR]
+_GLYPH_TABLE: bytes = bytes({_WALL: 1, _FLOOR: 2}.get(code, 0) for code in range(256))
+
+
+def _room_centers(tree: BSP) -> List[Tuple[int, int] | None]:
+    # For every node, the centre of the first room in its subtree (or None).
+    # Reversed preorder visits children before their parent.
+    centers: List[Tuple[int, int] | None] = [None] * len(tree)
+    order = list(tree.preorder())
+    for index in reversed(order):
+        if tree.is_leaf(index):
+            room = tree.room(index)
+            if room is not None:
+                x, y, _, _ = tree.bounds(index)
+                centers[index] = (x + room.x + room.w // 2, y + room.y + room.h // 2)
+        else:
+            left, right = tree.children(index)
+            centers[index] = centers[left] or centers[right]
+    return centers
+
+
+def rasterize_types(tree: BSP, corridor_width: int = 1) -> bytearray:
+    # Row-major TileType codes for the whole tree: walls everywhere, rooms
+    # carved out as floor and every pair of sibling subtrees joined by an
+    # L-shaped corridor between their first rooms. All fills are slice
+    # assignments, one per room row or corridor leg.
+    width, height = tree.width, tree.height
+    grid = bytearray([_WALL]) * (width * height)
+    for x, y, w, h in tree.room_bounds():
+        x0, x1 = max(0, x), min(width, x + w)
+        if x0 >= x1:
+            continue
+        row = bytes([_FLOOR]) * (x1 - x0)
+        for yy in range(max(0, y), min(height, y + h)):
+            grid[yy * width + x0 : yy * width + x1] = row
+
+    centers = _room_centers(tree)
+    for index in range(len(tree)):
+        left, right = tree.children(index)
+        if left == NO_NODE:
+            continue
+        a, b = centers[left], centers[right]
+        if a is None or b is None:
+            continue
+        (ax, ay), (bx, by) = a, b
+        for offset in range(corridor_width):
+            # Horizontal leg along row ay, then vertical leg down column bx.
+            y = min(height - 1, ay + offset)
+            x0, x1 = min(ax, bx), min(width - 1, max(ax, bx) + corridor_width - 1)
+            grid[y * width + x0 : y * width + x1 + 1] = bytes([_FLOOR]) * (x1 - x0 + 1)
+            x = min(width - 1, bx + offset)
+            y0, y1 = min(ay, by), max(ay, by)
+            grid[y0 * width + x : y1 * width + x + 1 : width] = bytes([_FLOOR]) * (
+                y1 - y0 + 1
+            )
+    return grid
+
+
+def rasterize(tree: BSP, corridor_width: int = 1) -> TileStore:
+    types = rasterize_types(tree, corridor_width)
+    return TileStore.from_buffers(
+        tree.width,
+        tree.height,
+        types,
+        types.translate(_GLYPH_TABLE),
+        bytearray(len(types)),
+        _GLYPHS,
+    )
+
+
+def to_map_data(tree: BSP, corridor_width: int = 1) -> MapData:
+    # A playable map with the player in the middle of the first room.
+    tiles = rasterize(tree, corridor_width)
+    player_pos = (0, 0)
+    centers = _room_centers(tree)
+    if centers and centers[0] is not None:
+        player_pos = centers[0]
+        tiles.set_flag(player_pos[1] * tiles.width + player_pos[0], FLAG_PLAYER, True)
+    return MapData(
+        tiles,
+        (tiles.width, tiles.height),
+        player_pos,
+        PLAYER_CHAR,
+        chars={FLOOR_CHAR, WALL_CHAR},
+    )
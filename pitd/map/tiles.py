@@ -0,0 +1,209 @@
+from enum import IntEnum
+from typing import Dict, Iterator, List, Sequence
+
+__all__ = [
+    "TileType",
+    "TileStore",
+    "TileView",
+    "FLAG_PLAYER",
+    "FLAG_VISIBLE",
+    "TILE_SIZE",
+]
+
+
+class TileType(IntEnum):
+    FLOOR = 1
+    WALL = 2
+    EMPTY = 3
+
+
+FLAG_PLAYER: int = 1
+FLAG_VISIBLE: int = 2
+
+# Width and height of one tile on screen, in pixels.
+TILE_SIZE: int = 20
+
+# Lookup tables for bytes.translate, indexed by type code.
+_TRANSPARENT: bytes = bytes(
+    0 if code == TileType.WALL else 1 for code in range(256)
+)
+
+
+def _translate(buf: bytearray | memoryview, table: bytes) -> bytearray:
+    if isinstance(buf, bytearray):
+        return buf.translate(table)
+    return bytearray(buf).translate(table)
+
+
+class TileView:
+    __slots__ = ("store", "x", "y", "index")
+
+    def __init__(self, store: "TileStore", x: int, y: int):
+        self.store = store
+        self.x = x
+        self.y = y
+        self.index = y * store.width + x
+
+    def __repr__(self) -> str:
+        return (
+            f"TileView(x={self.x}, y={self.y}, c={self.c!r}, "
+            f"tile_type={self.tile_type!r}, has_player={self.has_player}, "
+            f"visible={self.visible})"
+        )
+
+    @property
+    def c(self) -> str:
+        return self.store.glyph_chars[self.store.glyphs[self.index]]
+
+    @c.setter
+    def c(self, value: str) -> None:
+        self.store.glyphs[self.index] = self.store.glyph_code(value)
+
+    @property
+    def tile_type(self) -> TileType:
+        return TileType(self.store.types[self.index])
+
+    @tile_type.setter
+    def tile_type(self, value: TileType) -> None:
+        self.store.types[self.index] = value
+
+    @property
+    def has_player(self) -> bool:
+        return bool(self.store.flags[self.index] & FLAG_PLAYER)
+
+    @has_player.setter
+    def has_player(self, value: bool) -> None:
+        self.store.set_flag(self.index, FLAG_PLAYER, value)
+
+    @property
+    def visible(self) -> bool:
+        return bool(self.store.flags[self.index] & FLAG_VISIBLE)
+
+    @visible.setter
+    def visible(self, value: bool) -> None:
+        self.store.set_flag(self.index, FLAG_VISIBLE, value)
+
+    def set_visible(self, value: bool) -> None:
+        self.visible = value
+
+    def is_wall(self) -> bool:
+        return self.store.types[self.index] == TileType.WALL
+
+
+class _TileRow:
+    __slots__ = ("store", "y")
+
+    def __init__(self, store: "TileStore", y: int):
+        self.store = store
+        self.y = y
+
+    def __len__(self) -> int:
+        return self.store.width
+
+    def __getitem__(self, x: int) -> TileView:
+        if not 0 <= x < self.store.width:
+            raise IndexError(x)
+        return TileView(self.store, x, self.y)
+
+    def __iter__(self) -> Iterator[TileView]:
+        for x in range(self.store.width):
+            yield TileView(self.store, x, self.y)
+
+
+class TileStore:
+    def __init__(self, width: int = 0):
+        self.width: int = width
+        self.height: int = 0
+        # Buffers are bytearrays while a map is being built, or writable
+        # memoryviews over a memory-mapped compiled map.
+        self.types: bytearray | memoryview = bytearray()
+        self.glyphs: bytearray | memoryview = bytearray()
+        self.flags: bytearray | memoryview = bytearray()
+        self.glyph_chars: List[str] = [" "]
+        self._glyph_codes: Dict[str, int] = {" ": 0}
+
+    @classmethod
+    def from_buffers(
+        cls,
+        width: int,
+        height: int,
+        types: bytearray | memoryview,
+        glyphs: bytearray | memoryview,
+        flags: bytearray | memoryview,
+        glyph_chars: Sequence[str],
+    ) -> "TileStore":
+        size = width * height
+        if not len(types) == len(glyphs) == len(flags) == size:
+            raise ValueError(f"tile buffers do not match a {width}x{height} map")
+        tiles = cls(width)
+        tiles.height = height
+        tiles.types, tiles.glyphs, tiles.flags = types, glyphs, flags
+        tiles.glyph_chars = list(glyph_chars)
+        tiles._glyph_codes = {c: i for i, c in enumerate(tiles.glyph_chars)}
+        return tiles
+
+    def __len__(self) -> int:
+        return self.height
+
+    def __getitem__(self, y: int) -> _TileRow:
+        if not 0 <= y < self.height:
+            raise IndexError(y)
+        return _TileRow(self, y)
+
+    def __iter__(self) -> Iterator[_TileRow]:
+        for y in range(self.height):
+            yield _TileRow(self, y)
+
+    def tile(self, x: int, y: int) -> TileView:
+        return self[y][x]
+
+    def in_bounds(self, x: int, y: int) -> bool:
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def type_at(self, x: int, y: int) -> TileType:
+        return TileType(self.types[y * self.width + x])
+
+    def glyph_code(self, c: str) -> int:
+        code = self._glyph_codes.get(c)
+        if code is None:
+            if len(self.glyph_chars) > 0xFF:
+                raise ValueError("a map can use at most 256 distinct glyphs")
+            code = self._glyph_codes[c] = len(self.glyph_chars)
+            self.glyph_chars.append(c)
+        return code
+
+    def append_row(self, types: bytes, glyphs: bytes, flags: bytes) -> None:
+        if not isinstance(self.types, bytearray):
+            raise TypeError("cannot append rows to a memory-mapped tile store")
+        assert isinstance(self.glyphs, bytearray)
+        assert isinstance(self.flags, bytearray)
+        if not self.width:
+            self.width = len(types)
+        if len(types) > self.width:
+            raise ValueError(
+                f"row {self.height} has {len(types)} tiles, map is {self.width} wide"
+            )
+        pad = self.width - len(types)
+        self.types += types
+        self.types += bytes([TileType.EMPTY]) * pad
+        self.glyphs += glyphs
+        self.glyphs += bytes(pad)
+        self.flags += flags
+        self.flags += bytes(pad)
+        self.height += 1
+
+    def set_flag(self, index: int, flag: int, value: bool) -> None:
+        if value:
+            self.flags[index] |= flag
+        else:
+            self.flags[index] &= 0xFF ^ flag
+
+    def fill_flag(self, flag: int, value: bool) -> None:
+        if value:
+            table = bytes(code | flag for code in range(256))
+        else:
+            table = bytes(code & (0xFF ^ flag) for code in range(256))
+        self.flags[:] = _translate(self.flags, table)
+
+    def transparency(self) -> bytearray:
+        return _translate(self.types, _TRANSPARENT)
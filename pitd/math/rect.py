@@ -26,15 +26,11 @@ class Rect:
         )
 
     def collides_near(self, other: Self, padding: int = 1) -> bool:
-        near_rect = Rect(
-            max(0, self.x - padding),
-            max(0, self.y - padding),
-            self.w + padding * 2,
-            self.h + padding * 2,
-        )
+        near_x = max(0, self.x - padding)
+        near_y = max(0, self.y - padding)
         return (
-            near_rect.x < other.x + other.w
-            and near_rect.x + near_rect.w > other.x
-            and near_rect.y < other.y + other.h
-            and near_rect.y + near_rect.h > other.y
+            near_x < other.x + other.w
+            and near_x + self.w + padding * 2 > other.x
+            and near_y < other.y + other.h
+            and near_y + self.h + padding * 2 > other.y
         )
@@ -0,0 +1,57 @@
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any, Callable, List, Sequence, Tuple, TypeVar
+
+__all__ = ["ChunkedPool"]
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class ChunkedPool:
+    # A process pool, started on first use, that splits a batch into a few
+    # chunks per worker so each task amortises its pickling overhead.
+    def __init__(
+        self,
+        workers: int,
+        chunks_per_worker: int = 4,
+        initializer: Callable[..., None] | None = None,
+        initargs: Tuple[Any, ...] = (),
+    ):
+        self.workers: int = workers
+        self.chunks_per_worker: int = chunks_per_worker
+        self.initializer: Callable[..., None] | None = initializer
+        self.initargs: Tuple[Any, ...] = initargs
+        self._executor: Executor | None = None
+
+    def __enter__(self) -> "ChunkedPool":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def map(
+        self, func: Callable[[Sequence[T]], List[R]], items: Sequence[T]
+    ) -> List[R]:
+        # func maps a chunk of items to one result each; results come back
+        # in the order of items.
+        chunk_count = min(len(items), self.workers * self.chunks_per_worker)
+        size = -(-len(items) // max(1, chunk_count))
+        chunks = [items[i : i + size] for i in range(0, len(items), size)]
+        results: List[R] = []
+        for chunk in self._get_executor().map(func, chunks):
+            results.extend(chunk)
+        return results
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=self.initializer,
+                initargs=self.initargs,
+            )
+        return self._executor
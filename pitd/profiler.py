@@ -0,0 +1,152 @@
+import csv
+import json
+import time
+from array import array
+from typing import Callable, Dict, List, Sequence, Tuple
+
+import pygame
+
+__all__ = ["FrameProfiler", "PHASES", "EVENTS", "UPDATE", "RENDER", "FLIP"]
+
+PHASES: Tuple[str, ...] = ("events", "update", "render", "flip")
+EVENTS, UPDATE, RENDER, FLIP = range(len(PHASES))
+PERCENTILES: Tuple[int, ...] = (50, 95, 99)
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    # Nearest-rank percentile; values must already be sorted.
+    if not values:
+        return 0.0
+    rank = max(0, min(len(values) - 1, int(q / 100.0 * len(values) + 0.5) - 1))
+    return values[rank]
+
+
+class FrameProfiler:
+    def __init__(
+        self,
+        capacity: int = 600,
+        enabled: bool = True,
+        clock: Callable[[], float] = time.perf_counter,
+    ):
+        self.capacity: int = capacity
+        self.enabled: bool = enabled
+        self.clock: Callable[[], float] = clock
+        # Per scene, one ring of seconds per phase, all sharing a write slot.
+        self._rings: Dict[str, List[array]] = {}
+        self._counts: Dict[str, int] = {}
+        self._frame: List[float] = [0.0] * len(PHASES)
+        self._scene: str = ""
+        self._last: float = 0.0
+        self._font: pygame.font.Font | None = None
+
+    def begin(self, scene: str) -> None:
+        if not self.enabled:
+            return
+        self._scene = scene
+        for i in range(len(self._frame)):
+            self._frame[i] = 0.0
+        self._last = self.clock()
+
+    def lap(self, phase: int) -> None:
+        # Charge the time since the previous lap (or begin) to phase.
+        if not self.enabled:
+            return
+        now = self.clock()
+        self._frame[phase] += now - self._last
+        self._last = now
+
+    def end(self) -> None:
+        if not self.enabled:
+            return
+        rings = self._rings.get(self._scene)
+        if rings is None:
+            rings = [array("d", bytes(8 * self.capacity)) for _ in PHASES]
+            self._rings[self._scene] = rings
+        count = self._counts.get(self._scene, 0)
+        slot = count % self.capacity
+        for ring, value in zip(rings, self._frame):
+            ring[slot] = value
+        self._counts[self._scene] = count + 1
+
+    @property
+    def scenes(self) -> List[str]:
+        return list(self._rings)
+
+    def frames(self, scene: str) -> int:
+        return self._counts.get(scene, 0)
+
+    def samples(self, scene: str, phase: int) -> List[float]:
+        # The buffered samples for one phase, oldest first, in seconds.
+        ring = self._rings[scene][phase]
+        count = self._counts[scene]
+        if count <= self.capacity:
+            return ring[:count].tolist()
+        slot = count % self.capacity
+        return ring[slot:].tolist() + ring[:slot].tolist()
+
+    def totals(self, scene: str) -> List[float]:
+        phases = [self.samples(scene, phase) for phase in range(len(PHASES))]
+        return [sum(frame) for frame in zip(*phases)]
+
+    def summary(self, scene: str) -> Dict[str, Dict[str, float]]:
+        # Percentiles and maximum per phase (plus the whole frame) in ms.
+        result: Dict[str, Dict[str, float]] = {}
+        columns = [self.samples(scene, phase) for phase in range(len(PHASES))]
+        columns.append(self.totals(scene))
+        for name, values in zip((*PHASES, "total"), columns):
+            values.sort()
+            stats = {f"p{q}": percentile(values, q) * 1000.0 for q in PERCENTILES}
+            stats["max"] = values[-1] * 1000.0 if values else 0.0
+            result[name] = stats
+        return result
+
+    def export(self, path: str) -> None:
+        # CSV gets one row per buffered frame; anything else is JSON with a
+        # per-scene summary alongside the raw samples.
+        if path.endswith(".csv"):
+            with open(path, "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(["scene", "frame", *PHASES])
+                for scene in self.scenes:
+                    first = max(0, self.frames(scene) - self.capacity)
+                    columns = [
+                        self.samples(scene, phase) for phase in range(len(PHASES))
+                    ]
+                    for i, frame in enumerate(zip(*columns)):
+                        writer.writerow(
+                            [scene, first + i, *(f"{t * 1000.0:.4f}" for t in frame)]
+                        )
+            return
+        data = {
+            scene: {
+                "frames": self.frames(scene),
+                "summary": self.summary(scene),
+                "samples": {
+                    name: [t * 1000.0 for t in self.samples(scene, phase)]
+                    for phase, name in enumerate(PHASES)
+                },
+            }
+            for scene in self.scenes
+        }
+        with open(path, "w") as f:
+            json.dump({"unit": "ms", "scenes": data}, f, indent=2)
+
+    def draw_overlay(self, surface: pygame.Surface, scene: str) -> pygame.Rect:
+        if self._font is None:
+            self._font = pygame.font.Font(None, 18)
+        lines = [f"{scene}  {self.frames(scene)} frames"]
+        if scene in self._rings:
+            for name, stats in self.summary(scene).items():
+                lines.append(
+                    f"{name:<7}"
+                    + "".join(f" p{q} {stats[f'p{q}']:6.2f}" for q in PERCENTILES)
+                    + " ms"
+                )
+        rendered = [self._font.render(line, True, (255, 255, 255)) for line in lines]
+        height = self._font.get_linesize()
+        width = max(text.get_width() for text in rendered)
+        rect = pygame.Rect(0, 0, width + 8, height * len(rendered) + 8)
+        surface.fill((0, 0, 0), rect)
+        for i, text in enumerate(rendered):
+            surface.blit(text, (4, 4 + i * height))
+        return rect
@@ -1,4 +1,4 @@
-from random import choice
+from random import Random, choice
 import hashlib
 from string import ascii_letters, digits
 
@@ -17,3 +17,10 @@ class Seed:
 
     def get(self) -> int:
         return self.hash
+
+    def rng(self, stream: str = "") -> Random:
+        # A private generator seeded from the hash; named streams give
+        # independent sequences (e.g. debug colours) for the same seed.
+        if stream:
+            return Random(f"{self.hash}/{stream}")
+        return Random(self.hash)
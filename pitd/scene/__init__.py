@@ -1,17 +1,26 @@
 from abc import ABCMeta, abstractmethod
-from typing import Any, Self
+from typing import Any, List
 import pygame
 
-__all__ = ["Scene"]
+__all__ = ["Scene", "StaticScene"]
 
 
 class Scene(metaclass=ABCMeta):
+    @classmethod
+    def create(
+        cls, game_dir: str, cache_dir: str | None = None, **kwargs: Any
+    ) -> "Scene":
+        # Factory used by the scene registry; scenes that need the game or
+        # cache directory override it to pick them up.
+        return cls(**kwargs)
+
     @abstractmethod
     def render(self, surface: pygame.Surface) -> None:
         pass
 
     @abstractmethod
-    def update(self, dt: float) -> Self:
+    def update(self, dt: float) -> "Scene":
+        # Returns the scene to run next frame: self, or a replacement.
         pass
 
     @abstractmethod
@@ -25,3 +34,57 @@ class Scene(metaclass=ABCMeta):
     @abstractmethod
     def should_quit(self) -> bool:
         pass
+
+    def load(self) -> None:
+        # Expensive setup (generation, parsing). It may run on a worker
+        # thread while a loading scene is shown, so it must not use the
+        # display.
+        pass
+
+    def activate(self) -> None:
+        # Setup that needs the display or fonts, run on the main thread
+        # after load() and before the first update.
+        pass
+
+    def dirty_rects(self) -> List[pygame.Rect] | None:
+        # Screen areas changed by the last render, or None when the whole
+        # surface must be pushed to the display.
+        return None
+
+    def invalidate(self) -> None:
+        pass
+
+    def needs_render(self) -> bool:
+        return True
+
+
+class StaticScene(Scene):
+    # A scene whose picture only changes when invalidated: draw() runs once
+    # per invalidate and that frame is pushed to the display whole.
+    def __init__(self) -> None:
+        self._needs_redraw: bool = True
+        self._full_redraw: bool = True
+
+    @abstractmethod
+    def draw(self, surface: pygame.Surface) -> None:
+        pass
+
+    def render(self, surface: pygame.Surface) -> None:
+        if not self._needs_redraw:
+            return
+        surface.fill((0, 0, 0))
+        self.draw(surface)
+        self._needs_redraw = False
+
+    def dirty_rects(self) -> List[pygame.Rect] | None:
+        if self._full_redraw:
+            self._full_redraw = False
+            return None
+        return []
+
+    def needs_render(self) -> bool:
+        return self._needs_redraw
+
+    def invalidate(self) -> None:
+        self._needs_redraw = True
+        self._full_redraw = True
@@ -0,0 +1,59 @@
+from typing import Dict, Iterable, Tuple
+import pygame
+
+__all__ = ["GlyphAtlas"]
+
+Color = Tuple[int, int, int]
+
+
+class GlyphAtlas:
+    def __init__(
+        self,
+        font: pygame.Font,
+        cell_size: Tuple[int, int],
+        columns: int = 32,
+        background: Color = (0, 0, 0),
+    ):
+        self.font: pygame.Font = font
+        self.cell_w, self.cell_h = cell_size
+        self.columns: int = columns
+        self.background: Color = background
+        self.sheet: pygame.Surface = pygame.Surface(
+            (self.cell_w * self.columns, self.cell_h)
+        )
+        self.sheet.fill(self.background)
+        self._areas: Dict[Tuple[str, Color], pygame.Rect] = {}
+
+    def __len__(self) -> int:
+        return len(self._areas)
+
+    def preload(self, chars: Iterable[str], colors: Iterable[Color]) -> None:
+        colors = list(colors)
+        for c in chars:
+            for color in colors:
+                self.area(c, color)
+
+    def area(self, c: str, color: Color) -> pygame.Rect:
+        rect = self._areas.get((c, color))
+        if rect is None:
+            rect = self._areas[c, color] = self._add(c, color)
+        return rect
+
+    def _add(self, c: str, color: Color) -> pygame.Rect:
+        row, col = divmod(len(self._areas), self.columns)
+        if (row + 1) * self.cell_h > self.sheet.get_height():
+            self._grow()
+        x, y = col * self.cell_w, row * self.cell_h
+        # Glyphs are drawn onto an opaque background so the sheet, and every
+        # blit from it, skips per-pixel alpha.
+        glyph = self.font.render(c, True, color, self.background)
+        w = min(glyph.get_width(), self.cell_w)
+        h = min(glyph.get_height(), self.cell_h)
+        self.sheet.blit(glyph, (x, y), (0, 0, w, h))
+        return pygame.Rect(x, y, w, h)
+
+    def _grow(self) -> None:
+        old = self.sheet
+        self.sheet = pygame.Surface((old.get_width(), old.get_height() * 2))
+        self.sheet.fill(self.background)
+        self.sheet.blit(old, (0, 0))
@@ -1,22 +1,43 @@
-from . import Scene
+from . import StaticScene
 from ..map import bsp
+from ..map.batch import BSPParams
+from ..map.layout_cache import LayoutCache
 
 import pygame
-from typing import Self, Any
+from typing import Any, Self
 
 
-class BSPScene(Scene):
-    def __init__(self):
+class BSPScene(StaticScene):
+    def __init__(self, cache_dir: str | None = None):
         super().__init__()
         self._should_quit = False
-        self.bsp = bsp.BSP(600, 600, 80, 50)
-        self.bsp.generate("test", 5)
-        self.bsp.generate_rooms((40, 40), (90, 90))
-
-    def render(self, surface: pygame.Surface) -> None:
-        surface.fill((0, 0, 0))
+        self.seed = "test"
+        self.params = BSPParams(
+            600, 600, 80, 50, 5, (40, 40), (90, 90), rooms_only=False
+        )
+        self.cache: LayoutCache | None = LayoutCache(cache_dir) if cache_dir else None
+        # Empty until load() builds or fetches the tree for these params.
+        self.bsp = bsp.BSP(
+            self.params.width,
+            self.params.height,
+            self.params.min_node_size,
+            self.params.max_room_size,
+        )
+
+    @classmethod
+    def create(
+        cls, game_dir: str, cache_dir: str | None = None, **kwargs: Any
+    ) -> "BSPScene":
+        return cls(cache_dir=cache_dir, **kwargs)
+
+    def load(self) -> None:
+        if self.cache is None:
+            self.bsp = self.params.build(self.seed)
+        else:
+            self.bsp = bsp.BSP.from_bytes(self.cache.fetch(self.params, self.seed))
+
+    def draw(self, surface: pygame.Surface) -> None:
         self.bsp.debug_render(surface)
-        pygame.display.flip()
 
     def update(self, dt: float) -> Self:
         return self
@@ -0,0 +1,64 @@
+from typing import Tuple
+import pygame
+
+__all__ = ["Camera"]
+
+
+class Camera:
+    def __init__(
+        self,
+        viewport: Tuple[int, int],
+        tile_size: int,
+        world: Tuple[int, int],
+        margin: int = 0,
+    ):
+        self.tile_size: int = tile_size
+        self.viewport: Tuple[int, int] = viewport
+        # Viewport size in tiles, counting a partly visible last column/row.
+        self.cols: int = -(-viewport[0] // tile_size)
+        self.rows: int = -(-viewport[1] // tile_size)
+        self.world: Tuple[int, int] = world
+        self.margin: int = margin
+        self.x: int = 0
+        self.y: int = 0
+
+    def follow(self, tx: int, ty: int) -> bool:
+        # Scroll only once the target gets within margin tiles of an edge,
+        # so most moves leave the view (and the screen) untouched.
+        x = self._follow_axis(self.x, tx, self.cols, self.world[0])
+        y = self._follow_axis(self.y, ty, self.rows, self.world[1])
+        moved = (x, y) != (self.x, self.y)
+        self.x, self.y = x, y
+        return moved
+
+    def center(self, tx: int, ty: int) -> None:
+        self.x = self._clamp(tx - self.cols // 2, self.cols, self.world[0])
+        self.y = self._clamp(ty - self.rows // 2, self.rows, self.world[1])
+
+    def tile_bounds(self) -> Tuple[int, int, int, int]:
+        return (
+            self.x,
+            self.y,
+            min(self.world[0], self.x + self.cols),
+            min(self.world[1], self.y + self.rows),
+        )
+
+    def to_screen(self, tx: int, ty: int) -> Tuple[int, int]:
+        return (tx - self.x) * self.tile_size, (ty - self.y) * self.tile_size
+
+    def tile_rect(self, x0: int, y0: int, x1: int, y1: int) -> pygame.Rect:
+        sx, sy = self.to_screen(x0, y0)
+        return pygame.Rect(
+            sx, sy, (x1 - x0) * self.tile_size, (y1 - y0) * self.tile_size
+        )
+
+    def _follow_axis(self, pos: int, target: int, span: int, world: int) -> int:
+        margin = min(self.margin, (span - 1) // 2)
+        if target < pos + margin:
+            pos = target - margin
+        elif target >= pos + span - margin:
+            pos = target - span + margin + 1
+        return self._clamp(pos, span, world)
+
+    def _clamp(self, pos: int, span: int, world: int) -> int:
+        return max(0, min(pos, world - span))
@@ -0,0 +1,81 @@
+from . import Scene
+
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from typing import Any, List
+import pygame
+
+__all__ = ["LoadingScene"]
+
+
+class LoadingScene(Scene):
+    # Runs target.load() on a worker thread and draws a progress line until
+    # it finishes, then activates the target and hands over to it from
+    # update().
+    def __init__(
+        self,
+        target: Scene,
+        executor: Executor | None = None,
+        message: str = "Loading",
+    ):
+        super().__init__()
+        self.target: Scene = target
+        self.message: str = message
+        self.font: pygame.Font = pygame.Font(size=24)
+        self._owns_executor: bool = executor is None
+        self._executor: Executor = executor or ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="scene-load"
+        )
+        self._future: Future[None] = self._executor.submit(target.load)
+        self._elapsed: float = 0.0
+        self._drawn: int = -1
+        self._full_redraw: bool = True
+        self._should_quit: bool = False
+
+    @property
+    def done(self) -> bool:
+        return self._future.done()
+
+    def render(self, surface: pygame.Surface) -> None:
+        dots = int(self._elapsed / 0.25) % 4
+        if dots == self._drawn and not self._full_redraw:
+            return
+        self._drawn = dots
+        self._full_redraw = True
+        surface.fill((0, 0, 0))
+        text = self.font.render(self.message + "." * dots, True, (255, 255, 255))
+        w, h = surface.get_size()
+        surface.blit(text, (w // 2 - text.get_width() // 2, h // 2))
+
+    def update(self, dt: float) -> Scene:
+        self._elapsed += dt
+        if not self._future.done():
+            return self
+        if self._owns_executor:
+            self._executor.shutdown(wait=False)
+        # Re-raise any failure from the worker on the main thread.
+        self._future.result()
+        self.target.activate()
+        return self.target
+
+    def get_event(self, event: pygame.Event) -> None:
+        pass
+
+    def set_data(self, name: str, value: Any) -> None:
+        pass
+
+    def should_quit(self) -> bool:
+        return self._should_quit
+
+    def dirty_rects(self) -> List[pygame.Rect] | None:
+        if self._full_redraw:
+            self._full_redraw = False
+            return None
+        return []
+
+    def needs_render(self) -> bool:
+        # Keep ticking while the worker runs so the handover is not held up
+        # by the main loop idling on the event queue.
+        return True
+
+    def invalidate(self) -> None:
+        self._full_redraw = True
@@ -1,21 +1,39 @@
-from . import Scene
+from . import StaticScene
 from ..map import map_gen
+from ..map.batch import MapGenParams
+from ..map.layout_cache import LayoutCache
 
 import pygame
-from typing import Self, Any
+from typing import Any, Self
 
 
-class MapGenScene(Scene):
-    def __init__(self):
+class MapGenScene(StaticScene):
+    def __init__(self, cache_dir: str | None = None, seed: str | None = None):
         super().__init__()
         self._should_quit = False
-        self.map_gen = map_gen.MapGen(50, 50)
-        self.map_gen.generate(5, 9)
-
-    def render(self, surface: pygame.Surface) -> None:
-        surface.fill((0, 0, 0))
+        self.params = MapGenParams(50, 50, 5, 9)
+        self.map_gen = map_gen.MapGen(self.params.width, self.params.height, seed)
+        # Without a seed every run gets a fresh random layout, which a cache
+        # keyed by seed would never hit again.
+        self.cache: LayoutCache | None = (
+            LayoutCache(cache_dir) if cache_dir and seed is not None else None
+        )
+
+    @classmethod
+    def create(
+        cls, game_dir: str, cache_dir: str | None = None, **kwargs: Any
+    ) -> "MapGenScene":
+        return cls(cache_dir=cache_dir, **kwargs)
+
+    def load(self) -> None:
+        if self.cache is None:
+            self.map_gen.generate(self.params.min_size, self.params.max_size)
+        else:
+            seed = self.map_gen.map_seed.seed
+            self.map_gen.load_grid(self.cache.fetch(self.params, seed))
+
+    def draw(self, surface: pygame.Surface) -> None:
         self.map_gen._debug_render(surface, 10)
-        pygame.display.flip()
 
     def update(self, dt: float) -> Self:
         return self
@@ -1,68 +1,170 @@
 from . import Scene
-from ..fov import FOV
+from ..fov import FOVCache, GridFOV
+from ..map.compiled import load_map
+from ..map.mapfile import MapData, ProgressFunc
+from ..map.paged import PagedMap
+from ..map.tiles import TILE_SIZE, TileStore, TileType, TileView
+from .atlas import Color, GlyphAtlas
+from .camera import Camera
 
 import math
 import os.path
-from dataclasses import dataclass
-from enum import Enum, auto
-from typing import Any, List, Self, Tuple
+from collections import OrderedDict
+from typing import Any, Dict, List, Self, Tuple
 import pygame
 
+__all__ = ["MapScene", "Map", "TileType"]
+
+
+# Width and height, in tiles, of each cached surface the map is drawn onto.
+REGION_TILES: int = 32
+PLAYER_COLOR: Color = (255, 255, 255)
+
 
 class MapScene(Scene):
-    def __init__(self, game_dir: str):
-        self.surfaceToDraw: pygame.Surface
+    def __init__(
+        self,
+        game_dir: str,
+        paged: bool = False,
+        max_surfaces: int = 16,
+        viewport: Tuple[int, int] = (800, 600),
+    ):
         self.game_dir = game_dir
         self.font: pygame.Font = pygame.Font(size=20)
         self.pos: Tuple[int, int] = (0, 0)
-        self.the_map: Map = Map(
-            self.game_dir, os.path.join("resources", "testmap.map"))
-        self.player_pos: Tuple[int, int] = self.the_map.player_pos
+        self.paged: bool = paged
+        self.the_map: Map | PagedMap
+        self.player_pos: Tuple[int, int] = (0, 0)
         self.player_keys: pygame.key.ScancodeWrapper = pygame.key.get_pressed()
         self.radius: int = 5
         self.max_dist: float = -1.0
         self._should_quit: bool = False
-        self.fov: FOV = FOV(self.radius, Tile.is_wall, Tile.set_visible)
+        self.fov: FOVCache = FOVCache(GridFOV(self.radius))
+        self.max_surfaces: int = max_surfaces
+        self.viewport: Tuple[int, int] = viewport
+        self.camera: Camera = Camera(viewport, TILE_SIZE, (0, 0))
+        self._surfaces: OrderedDict[Tuple[int, int], pygame.Surface] = OrderedDict()
+        self._drawn: Dict[Tuple[int, int], pygame.Surface] = {}
+        self._fov_rect: pygame.Rect | None = None
+        self._dirty: List[pygame.Rect] = []
+        self._full_redraw: bool = True
+        self.atlas: GlyphAtlas
+        self._shades: List[Color] = []
+
+    @classmethod
+    def create(
+        cls, game_dir: str, cache_dir: str | None = None, **kwargs: Any
+    ) -> "MapScene":
+        return cls(game_dir, **kwargs)
+
+    def load(self) -> None:
+        map_file = os.path.join("resources", "testmap.map")
+        self.the_map = (
+            PagedMap(self.game_dir, map_file)
+            if self.paged
+            else Map(self.game_dir, map_file)
+        )
+        self.player_pos = self.the_map.player_pos
+
+    def activate(self) -> None:
+        # Glyphs are rendered with pygame fonts, so this stays off the
+        # loader thread.
         self._setup()
 
     def _setup(self) -> None:
+        self._setup_glyphs()
+        self.camera = Camera(
+            self.viewport,
+            TILE_SIZE,
+            (self.the_map.cols, self.the_map.rows),
+            margin=self.radius + 1,
+        )
+        self.camera.center(*self.player_pos)
         self._create_map()
 
+    def _setup_glyphs(self) -> None:
+        # Shade for every offset inside the FOV box, indexed by
+        # (dy + radius) * (2 * radius + 1) + dx + radius.
+        span = range(-self.radius, self.radius + 1)
+        self._shades = []
+        for dy in span:
+            for dx in span:
+                color = self._calc_color_from_distance(0, 0, dx, dy)
+                self._shades.append((color.r, color.g, color.b))
+        self.atlas = GlyphAtlas(self.font, (TILE_SIZE, TILE_SIZE))
+        self.atlas.preload(self.the_map.glyph_chars, set(self._shades))
+        self.atlas.area(self.the_map.player_str, PLAYER_COLOR)
+
     def _create_map(self) -> None:
         self._write_to_surface()
 
+    def _region_surface(self, rx: int, ry: int) -> pygame.Surface:
+        surf = self._drawn.get((rx, ry))
+        if surf is None:
+            surf = self._surfaces.pop((rx, ry), None)
+            if surf is None:
+                if len(self._surfaces) >= self.max_surfaces:
+                    self._surfaces.popitem(last=False)
+                size = REGION_TILES * TILE_SIZE
+                surf = pygame.Surface((size, size))
+            surf.fill((0, 0, 0))
+            self._surfaces[rx, ry] = surf
+            self._drawn[rx, ry] = surf
+        return surf
+
     def _write_to_surface(self) -> None:
         if self.the_map.should_update_surface:
-            self.surfaceToDraw = pygame.Surface(
-                (self.the_map.width, self.the_map.height)
-            )
+            self._surfaces.clear()
             self.the_map.should_update_surface = False
-        self.surfaceToDraw.fill((0, 0, 0))
-        for row in self.the_map.map_lines:
-            for col in row:
-                col.set_visible(False)
+        self._drawn = {}
         px, py = self.player_pos
-        self.fov.check_visibility(px, py, self.the_map.map_lines)
-        for row in self.the_map.map_lines:
-            for col in row:
-                if col.visible:
-                    c = col.c
+        cols, rows = self.the_map.cols, self.the_map.rows
+        x0, y0 = max(0, px - self.radius), max(0, py - self.radius)
+        x1, y1 = min(cols, px + self.radius + 1), min(rows, py + self.radius + 1)
+        w, h = x1 - x0, y1 - y0
+        if self.camera.follow(px, py):
+            self.invalidate()
+        # Only tiles inside the old and new FOV boxes can change on screen.
+        fov_rect = self.camera.tile_rect(x0, y0, x1, y1).move(self.pos)
+        if self._fov_rect is not None:
+            self._dirty.append(self._fov_rect)
+        self._dirty.append(fov_rect)
+        self._fov_rect = fov_rect
+        mask = self.fov.compute(
+            px,
+            py,
+            self.the_map.transparency_window(x0, y0, w, h),
+            w,
+            h,
+            self.the_map.revision,
+            origin=(x0, y0),
+        )
+        # Only look up and draw visible tiles that are also on screen.
+        cx0, cy0, cx1, cy1 = self.camera.tile_bounds()
+        span = 2 * self.radius + 1
+        batches: Dict[Tuple[int, int], List[Tuple[Tuple[int, int], pygame.Rect]]] = {}
+        for y in range(max(y0, cy0), min(y1, cy1)):
+            shade_row = (y - py + self.radius) * span - px + self.radius
+            for x in range(max(x0, cx0), min(x1, cx1)):
+                if mask[(y - y0) * w + x - x0]:
+                    col = self.the_map.tile(x, y)
                     if col.has_player:
-                        c = self.the_map.player_str
-                        self.surfaceToDraw.blit(
-                            self.font.render(c, True, (255, 255, 255)),
-                            (col.x * 20, col.y * 20),
-                        )
+                        area = self.atlas.area(self.the_map.player_str, PLAYER_COLOR)
                     elif col.tile_type != TileType.EMPTY:
-                        surf = self.font.render(
-                            c,
-                            True,
-                            self._calc_color_from_distance(
-                                px, py, col.x, col.y),
-                            _calc_color_from_distance(px, py, col.x, col.y),
-                            _calc_color_from_distance(px, py, col.x, col.y),
-                        )
-                        self.surfaceToDraw.blit(surf, (col.x * 20, col.y * 20))
+                        area = self.atlas.area(col.c, self._shades[shade_row + x])
+                    else:
+                        continue
+                    rx, lx = divmod(x, REGION_TILES)
+                    ry, ly = divmod(y, REGION_TILES)
+                    batches.setdefault((rx, ry), []).append(
+                        ((lx * TILE_SIZE, ly * TILE_SIZE), area)
+                    )
+        # Fetch the sheet only now, since area() may have grown it.
+        sheet = self.atlas.sheet
+        for (rx, ry), items in batches.items():
+            self._region_surface(rx, ry).blits(
+                [(sheet, dest, area) for dest, area in items], doreturn=False
+            )
 
     def _calc_color_from_distance(
         self, px: int, py: int, tile_x: int, tile_y: int, alpha: int = 255
@@ -99,7 +201,8 @@ class MapScene(Scene):
         self.player_keys = keys
 
         if self.player_pos != (x, y):
-            if not self.the_map.map_lines[y][x].tile_type == TileType.WALL:
+            the_map = self.the_map
+            if the_map.in_bounds(x, y) and the_map.type_at(x, y) != TileType.WALL:
                 px, py = self.player_pos
                 self.the_map.set(px, py, "has_player", False)
                 self.the_map.set(x, y, "has_player", True)
@@ -109,8 +212,26 @@ class MapScene(Scene):
         return self
 
     def render(self, surface: pygame.Surface) -> None:
-        surface.fill((0, 0, 0))
-        surface.blit(self.surfaceToDraw, self.pos)
+        view = pygame.Rect(self.pos, self.viewport)
+        if self._full_redraw:
+            surface.fill((0, 0, 0))
+            boxes = [view]
+        elif self._dirty:
+            boxes = [rect.clip(view) for rect in self._dirty]
+            for rect in boxes:
+                surface.fill((0, 0, 0), rect)
+        else:
+            return
+        # Copy only the parts of each region that fall inside a box.
+        blits = []
+        for (rx, ry), surf in self._drawn.items():
+            sx, sy = self.camera.to_screen(rx * REGION_TILES, ry * REGION_TILES)
+            dest = surf.get_rect(topleft=(self.pos[0] + sx, self.pos[1] + sy))
+            for box in boxes:
+                part = dest.clip(box)
+                if part:
+                    blits.append((surf, part, part.move(-dest.x, -dest.y)))
+        surface.blits(blits, doreturn=False)
 
     def get_event(self, event: pygame.Event) -> None:
         pass
@@ -118,32 +239,31 @@ class MapScene(Scene):
     def set_data(self, name: str, value: Any) -> Any:
         if name == "map":
             self.the_map.parse(value)
-            self._create_map()
+        elif name == "map_data" and isinstance(self.the_map, Map):
+            self.the_map.load_data(value)
+        else:
+            return
+        self.player_pos = self.the_map.player_pos
+        self._fov_rect = None
+        self._setup()
+        self.invalidate()
 
     def should_quit(self) -> bool:
         return self._should_quit
 
+    def dirty_rects(self) -> List[pygame.Rect] | None:
+        rects: List[pygame.Rect] | None = self._dirty
+        if self._full_redraw:
+            rects = None
+            self._full_redraw = False
+        self._dirty = []
+        return rects
 
-class TileType(Enum):
-    FLOOR = auto()
-    WALL = auto()
-    EMPTY = auto()
+    def needs_render(self) -> bool:
+        return self._full_redraw or bool(self._dirty)
 
-
-@dataclass
-class Tile:
-    x: int
-    y: int
-    c: str
-    tile_type: TileType
-    has_player: bool = False
-    visible: bool = True
-
-    def set_visible(self, value: bool) -> None:
-        self.visible = value
-
-    def is_wall(self) -> bool:
-        return self.tile_type == TileType.WALL
+    def invalidate(self) -> None:
+        self._full_redraw = True
 
 
 class Map:
@@ -151,84 +271,78 @@ class Map:
         self.filename: str = ""
         self.game_dir: str = game_dir
         self.chars: set = set()
-        self.map_lines: List[List[Tile]] = []
+        self.tiles: TileStore = TileStore()
         self.new_info: bool = True
         self.width: int = -1
         self.height: int = -1
         self.should_update_surface: bool = True
-        self._mode: str = ""
         self.tile_data: dict = {}
         self.player_pos: Tuple[int, int] = (0, 0)
         self.player_str: str = "@"
+        self._transparency: bytearray | None = None
+        self.revision: int = 0
         self.parse(os.path.join(self.game_dir, filename))
 
-    def parse(self, filename: str) -> None:
+    def parse(
+        self,
+        filename: str,
+        progress: ProgressFunc | None = None,
+        use_cache: bool = True,
+    ) -> None:
         self.filename = os.path.join(self.game_dir, filename)
-        with open(self.filename, "r") as f:
-            for line in f.readlines():
-                line = line.strip()
-                if len(line) == 0:
-                    continue
-
-                if line == "[mapinfo]":
-                    self._mode = "info"
-                    continue
-                elif line == "[defs]":
-                    self._mode = "defs"
-                    continue
-                elif line == "[map]":
-                    self._mode = "map"
-                    continue
-                elif line.startswith("[/"):
-                    self._mode = ""
-                    continue
-
-                if self._mode == "info":
-                    self._read_info(line)
-                elif self._mode == "defs":
-                    self._read_defs(line)
-                elif self._mode == "map":
-                    self._read_map(line)
+        self.load_data(load_map(self.filename, progress, use_cache))
+
+    def load_data(self, data: MapData) -> None:
+        # Replace the map with already parsed or generated tiles.
+        self._transparency = None
+        self.revision += 1
+        self.tiles = data.tiles
+        self.tile_data.update(data.tile_data)
+        self.chars.update(data.chars)
+        self.player_pos = data.player_pos
+        self.player_str = data.player_str
+        if data.size is not None:
+            width, height = data.size[0] * TILE_SIZE, data.size[1] * TILE_SIZE
+            self.should_update_surface = self.width != width and self.height != height
+            self.width, self.height = width, height
 
     def set(self, x: int, y: int, key: str, value: Any) -> None:
-        setattr(self.map_lines[y][x], key, value)
-
-    def _read_info(self, line: str) -> None:
-        split = line.split("=")
-        if len(split) == 2:
-            name = split[0]
-            value = split[1]
-            if name == "size":
-                dims = value.split(",")
-                width, height = (int(dims[0]) * 20, int(dims[1]) * 20)
-                self.should_update_surface = (
-                    self.width != width and self.height != height
-                )
-                self.width, self.height = width, height
-
-    def _read_defs(self, line: str) -> None:
-        split = line.split("=")
-        if len(split) == 2:
-            name = split[0]
-            value = split[1]
-            self.tile_data[value] = name
-
-    def _read_map(self, line: str) -> None:
-        row = []
-        y = max(0, len(self.map_lines))
-        for x, c in enumerate(line):
-            self.chars.add(c)
-            data = self.tile_data.get(c)
-            if not data:
-                row.append(Tile(x, y, " ", TileType.EMPTY, visible=False))
-            else:
-                self.chars.add(c)
-                if data == "player":
-                    self.player_pos = x, y
-                    self.player_str = c
-                    row.append(Tile(x, y, ".", TileType.FLOOR, True))
-                elif data == "floor":
-                    row.append(Tile(x, y, c, TileType.FLOOR))
-                elif data == "wall":
-                    row.append(Tile(x, y, c, TileType.WALL))
-        self.map_lines.append(row)
+        setattr(self.tiles.tile(x, y), key, value)
+        # Only the tile type changes what blocks sight, so moving the player
+        # around keeps cached FOV results valid.
+        if key == "tile_type":
+            self._transparency = None
+            self.revision += 1
+
+    @property
+    def cols(self) -> int:
+        return self.tiles.width
+
+    @property
+    def rows(self) -> int:
+        return self.tiles.height
+
+    @property
+    def glyph_chars(self) -> List[str]:
+        return self.tiles.glyph_chars
+
+    def in_bounds(self, x: int, y: int) -> bool:
+        return self.tiles.in_bounds(x, y)
+
+    def tile(self, x: int, y: int) -> TileView:
+        return self.tiles.tile(x, y)
+
+    def type_at(self, x: int, y: int) -> TileType:
+        return self.tiles.type_at(x, y)
+
+    def transparency(self) -> bytearray:
+        if self._transparency is None:
+            self._transparency = self.tiles.transparency()
+        return self._transparency
+
+    def transparency_window(self, x0: int, y0: int, w: int, h: int) -> bytes:
+        grid = self.transparency()
+        cols = self.cols
+        return b"".join(
+            grid[y * cols + x0 : y * cols + x0 + w] for y in range(y0, y0 + h)
+        )
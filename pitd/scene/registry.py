@@ -0,0 +1,41 @@
+from . import Scene
+
+import importlib
+from typing import Any, Dict, List, Type
+
+__all__ = ["register", "scene_names", "scene_class", "create"]
+
+# Scene name -> "module:Class", imported only when the scene is first built.
+_SCENES: Dict[str, str] = {
+    "bsp": "pitd.scene.bsp_scene:BSPScene",
+    "mapgen": "pitd.scene.mapgen_scene:MapGenScene",
+    "map": "pitd.scene.mapscene:MapScene",
+}
+
+
+def register(name: str, target: str) -> None:
+    if ":" not in target:
+        raise ValueError(f"scene target must be 'module:Class', got {target!r}")
+    _SCENES[name] = target
+
+
+def scene_names() -> List[str]:
+    return sorted(_SCENES)
+
+
+def scene_class(name: str) -> Type[Scene]:
+    try:
+        target = _SCENES[name]
+    except KeyError:
+        raise KeyError(f"unknown scene {name!r}") from None
+    module, attr = target.split(":", 1)
+    cls = getattr(importlib.import_module(module), attr)
+    if not (isinstance(cls, type) and issubclass(cls, Scene)):
+        raise TypeError(f"{target} is not a Scene")
+    return cls
+
+
+def create(
+    name: str, game_dir: str, cache_dir: str | None = None, **kwargs: Any
+) -> Scene:
+    return scene_class(name).create(game_dir, cache_dir, **kwargs)
@@ -29,6 +29,13 @@ def run_tests() -> None:
     pytest.main(["testing/"])
 
 
+def run_benchmarks() -> None:
+    from benchmarks import fov
+
+    print("> fov benchmarks")
+    fov.main([])
+
+
 if __name__ == "__main__":
     parser = ArgumentParser(
         prog="Rouge", description="A Rogue-like written in pygame-ce"
@@ -38,6 +45,7 @@ if __name__ == "__main__":
     parser.add_argument("--test", action="store_true")
     parser.add_argument("--check-all", action="store_true")
     parser.add_argument("--check-types", action="store_true")
+    parser.add_argument("--bench", action="store_true")
 
     args = parser.parse_args()
 
@@ -50,6 +58,9 @@ if __name__ == "__main__":
     if args.test:
         run_tests()
 
+    if args.bench:
+        run_benchmarks()
+
     if args.build:
         PyInstaller.__main__.run(["pitd.spec"])
         resources_src = "resources"
@@ -0,0 +1,27 @@
+import pygame
+from pitd.scene.atlas import GlyphAtlas
+
+
+def _atlas(columns=4):
+    pygame.font.init()
+    return GlyphAtlas(pygame.Font(size=20), (20, 20), columns=columns)
+
+
+def test_atlas_reuses_areas():
+    atlas = _atlas()
+    first = atlas.area("#", (100, 100, 100))
+    assert atlas.area("#", (100, 100, 100)) is first
+    assert atlas.area("#", (50, 50, 50)) != first
+    assert len(atlas) == 2
+
+
+def test_atlas_grows_and_keeps_glyphs():
+    atlas = _atlas(columns=2)
+    area = atlas.area("#", (255, 255, 255))
+    pixels = [atlas.sheet.get_at((x, y)) for x in range(area.w) for y in range(area.h)]
+    atlas.preload(".@W", [(255, 255, 255), (10, 10, 10)])
+    assert len(atlas) == 7
+    assert atlas.sheet.get_height() >= 4 * 20
+    assert pixels == [
+        atlas.sheet.get_at((x, y)) for x in range(area.w) for y in range(area.h)
+    ]
@@ -0,0 +1,153 @@
+import sys
+
+import pygame
+
+from pitd.map.bsp import BSP, NO_NODE
+
+
+def layout(tree):
+    return [
+        (node.x, node.y, node.width, node.height, node.room)
+        for node in map(tree.node, tree.preorder())
+    ]
+
+
+def test_generation_is_reproducible():
+    a = BSP(600, 600, 80, 50)
+    b = BSP(600, 600, 80, 50)
+    for tree in (a, b):
+        tree.generate("test", 5)
+        tree.generate_rooms((40, 40), (90, 90))
+    assert layout(a) == layout(b)
+    assert a.rooms == sum(node[4] is not None for node in layout(a)) > 0
+
+
+def test_children_partition_their_parent():
+    tree = BSP(600, 400, 40, 50)
+    tree.generate("partition", 8)
+    tree.generate_rooms((10, 10), (30, 30))
+    for index in tree.preorder():
+        node = tree.node(index)
+        if tree.is_leaf(index):
+            room = node.room
+            if room is not None:
+                assert 0 <= room.x and room.x + room.w <= node.width
+                assert 0 <= room.y and room.y + room.h <= node.height
+            continue
+        left, right = node.left, node.right
+        assert left.is_left and not right.is_left
+        if left.horizontal:
+            assert left.width + right.width == node.width
+            assert right.x == node.x + left.width
+        else:
+            assert left.height + right.height == node.height
+            assert right.y == node.y + left.height
+
+
+def test_large_trees():
+    tree = BSP(1024, 1024, 4, 4)
+    tree.generate("large", sys.getrecursionlimit())
+    tree.generate_rooms((1, 1), (2, 2))
+    tree.prune(10)
+    assert tree.rooms == 10
+    assert len(tree) > 2**14
+
+
+def brute_rooms(tree):
+    return {
+        index: (
+            tree.node(index).x + room.x,
+            tree.node(index).y + room.y,
+            room.w,
+            room.h,
+        )
+        for index in tree.leaves()
+        if (room := tree.room(index)) is not None
+    }
+
+
+def test_point_queries_match_brute_force():
+    tree = BSP(300, 200, 20, 30)
+    tree.generate("queries", 8)
+    tree.generate_rooms((5, 5), (15, 15))
+    rooms = brute_rooms(tree)
+    assert tree.locate(-1, 0) == NO_NODE and tree.locate(300, 0) == NO_NODE
+    for y in range(0, 200, 7):
+        for x in range(0, 300, 7):
+            leaf = tree.locate(x, y)
+            lx, ly, lw, lh = tree.bounds(leaf)
+            assert tree.is_leaf(leaf)
+            assert lx <= x < lx + lw and ly <= y < ly + lh
+            inside = [
+                i
+                for i, (rx, ry, rw, rh) in rooms.items()
+                if rx <= x < rx + rw and ry <= y < ry + rh
+            ]
+            assert tree.room_at(x, y) == (inside[0] if inside else NO_NODE)
+
+            def distance(i):
+                rx, ry, rw, rh = rooms[i]
+                dx = max(rx - x, 0, x - (rx + rw - 1))
+                dy = max(ry - y, 0, y - (ry + rh - 1))
+                return dx * dx + dy * dy
+
+            best = min(distance(i) for i in rooms)
+            assert distance(tree.nearest_room(x, y)) == best
+
+
+def test_range_query_matches_brute_force():
+    tree = BSP(300, 200, 20, 30)
+    tree.generate("queries", 8)
+    tree.generate_rooms((5, 5), (15, 15))
+    rooms = brute_rooms(tree)
+    for x, y, w, h in [
+        (0, 0, 300, 200),
+        (40, 30, 80, 60),
+        (150, 100, 1, 1),
+        (0, 0, 0, 5),
+    ]:
+        expected = sorted(
+            i
+            for i, (rx, ry, rw, rh) in rooms.items()
+            if rx < x + w and x < rx + rw and ry < y + h and y < ry + rh
+        )
+        assert sorted(tree.rooms_in(x, y, w, h)) == expected
+    assert BSP(10, 10, 2, 2).nearest_room(0, 0) == NO_NODE
+
+
+def test_prune_keeps_a_reproducible_subset():
+    def pruned(max_rooms):
+        tree = BSP(600, 600, 20, 30)
+        tree.generate("prune", 10)
+        tree.generate_rooms((5, 5), (15, 15))
+        before = set(tree.room_bounds())
+        tree.prune(max_rooms)
+        return before, list(tree.room_bounds()), tree.rooms
+
+    before, after, rooms = pruned(3)
+    assert len(before) > 100
+    assert rooms == len(after) == 3
+    assert set(after) <= before
+    assert pruned(3)[1] == after
+    assert pruned(0)[2] == 0
+    assert len(pruned(len(before) + 1)[1]) == len(before)
+
+
+def test_debug_surface_is_rebuilt_after_changes():
+    tree = BSP(200, 200, 20, 30)
+    tree.generate("debug", 4)
+    surface = tree.debug_surface()
+    assert tree.debug_surface() is surface
+    for change in (
+        lambda: tree.generate_rooms((5, 5), (15, 15)),
+        lambda: tree.prune(1),
+        lambda: tree.generate("other", 4),
+    ):
+        before = pygame.image.tobytes(surface, "RGB")
+        change()
+        surface = tree.debug_surface()
+        assert pygame.image.tobytes(surface, "RGB") != before
+        assert tree.debug_surface() is surface
+    # Nothing left to prune, so the cached surface stays.
+    tree.prune(tree.rooms)
+    assert tree.debug_surface() is surface
@@ -0,0 +1,31 @@
+from pitd.scene.camera import Camera
+
+
+def test_camera_viewport_in_tiles():
+    camera = Camera((800, 600), 20, (100, 100))
+    assert (camera.cols, camera.rows) == (40, 30)
+    assert camera.tile_bounds() == (0, 0, 40, 30)
+    assert Camera((810, 600), 20, (100, 100)).cols == 41
+
+
+def test_camera_center_clamps_to_world():
+    camera = Camera((800, 600), 20, (100, 100))
+    camera.center(50, 50)
+    assert (camera.x, camera.y) == (30, 35)
+    camera.center(99, 0)
+    assert (camera.x, camera.y) == (60, 0)
+    small = Camera((800, 600), 20, (20, 20))
+    small.center(10, 10)
+    assert small.tile_bounds() == (0, 0, 20, 20)
+
+
+def test_camera_follow_scrolls_only_near_edges():
+    camera = Camera((800, 600), 20, (100, 100), margin=5)
+    camera.center(50, 50)
+    assert not camera.follow(51, 50)
+    assert not camera.follow(64, 50)
+    assert camera.follow(65, 50)
+    assert camera.x == 31
+    assert camera.to_screen(65, 50) == ((65 - 31) * 20, (50 - 35) * 20)
+    assert camera.follow(10, 40)
+    assert (camera.x, camera.y) == (5, 35)
@@ -0,0 +1,160 @@
+import os
+import random
+from benchmarks.fov import IMPLEMENTATIONS, reference_mask, run, verify
+from benchmarks.maps import MAPS
+from pitd.fov import BatchFOV, FOVCache, GridFOV, ShadowList
+from pitd.map.tiles import TileType
+from pitd.scene.mapscene import Map
+
+GAME_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RANDOM_SEED = 1337
+
+
+def _random_grid(rng, width, height, density):
+    return bytearray(rng.random() >= density for _ in range(width * height))
+
+
+def test_grid_fov_matches_fov_on_testmap():
+    the_map = Map(GAME_DIR, os.path.join("resources", "testmap.map"))
+    grid = the_map.transparency()
+    w, h = the_map.cols, the_map.rows
+    for radius in (1, 5, 12):
+        fov = GridFOV(radius)
+        for y in range(h):
+            for x in range(w):
+                assert fov.compute(x, y, grid, w, h) == reference_mask(
+                    x, y, grid, w, h, radius
+                )
+
+
+def test_grid_fov_matches_fov_on_random_grids():
+    rng = random.Random(RANDOM_SEED)
+    for _ in range(20):
+        w, h = rng.randint(1, 30), rng.randint(1, 30)
+        grid = _random_grid(rng, w, h, rng.choice((0.1, 0.3, 0.5)))
+        radius = rng.randint(1, 15)
+        x, y = rng.randrange(w), rng.randrange(h)
+        assert GridFOV(radius).compute(x, y, grid, w, h) == reference_mask(
+            x, y, grid, w, h, radius
+        )
+
+
+def test_grid_fov_reuses_out_buffer():
+    grid = bytearray(b"\x01" * 25)
+    out = bytearray(b"\x01" * 25)
+    mask = GridFOV(1).compute(0, 0, grid, 5, 5, out=out)
+    assert mask is out
+    assert sum(mask) == 4
+
+
+def test_grid_fov_accepts_memoryview():
+    grid = bytearray(b"\x01" * 16)
+    assert GridFOV(3).compute(1, 1, memoryview(grid), 4, 4) == GridFOV(
+        3
+    ).compute(1, 1, grid, 4, 4)
+
+
+def test_shadow_list_merges_overlapping_and_touching():
+    shadows = ShadowList()
+    shadows.add(0.5, 0.6)
+    shadows.add(0.1, 0.2)
+    shadows.add(0.2, 0.3)
+    assert (shadows.starts, shadows.ends) == ([0.1, 0.5], [0.3, 0.6])
+    shadows.add(0.25, 0.55)
+    assert (shadows.starts, shadows.ends) == ([0.1], [0.6])
+
+
+def test_shadow_list_covers():
+    shadows = ShadowList()
+    shadows.add(0.2, 0.4)
+    shadows.add(0.6, 0.8)
+    assert shadows.covers(0.2) and shadows.covers(0.4) and shadows.covers(0.7)
+    assert not shadows.covers(0.1)
+    assert not shadows.covers(0.5)
+    assert not shadows.covers(0.9)
+    assert shadows.covers_range(0.6, 0.8)
+    assert not shadows.covers_range(0.3, 0.7)
+
+
+def test_fov_cache_hits_and_evicts():
+    grid = bytearray(b"\x01" * 100)
+    cache = FOVCache(GridFOV(3), maxsize=2)
+    first = cache.compute(1, 1, grid, 10, 10, revision=1)
+    assert cache.compute(1, 1, grid, 10, 10, revision=1) is first
+    cache.compute(2, 2, grid, 10, 10, revision=1)
+    cache.compute(3, 3, grid, 10, 10, revision=1)
+    assert len(cache) == 2
+    cache.compute(1, 1, grid, 10, 10, revision=1)
+    assert (cache.hits, cache.misses) == (1, 4)
+
+
+def test_fov_cache_keys_on_the_window():
+    grid = bytearray(b"\x01" * 100)
+    cache = FOVCache(GridFOV(2))
+    full = cache.compute(5, 5, grid, 10, 10, revision=1)
+    window = cache.compute(5, 5, grid[:25], 5, 5, revision=1, origin=(3, 3))
+    assert len(full) == 100 and len(window) == 25
+    shifted = cache.compute(5, 5, grid[:25], 5, 5, revision=1, origin=(2, 2))
+    assert shifted != window
+    assert cache.compute(5, 5, grid, 10, 10, revision=1) is full
+    assert (cache.hits, cache.misses) == (1, 3)
+
+
+def test_fov_cache_invalidated_by_map_revision():
+    the_map = Map(GAME_DIR, os.path.join("resources", "testmap.map"))
+    cache = FOVCache(GridFOV(5))
+    x, y = the_map.player_pos
+    args = (x, y, the_map.transparency(), the_map.cols, the_map.rows)
+    before = cache.compute(*args, the_map.revision)
+    the_map.set(x + 1, y, "has_player", True)
+    assert cache.compute(*args, the_map.revision) is before
+    the_map.set(x + 1, y, "tile_type", TileType.WALL)
+    after = cache.compute(
+        x, y, the_map.transparency(), the_map.cols, the_map.rows, the_map.revision
+    )
+    assert after != before
+    assert len(cache) == 1
+
+
+def test_batch_fov_matches_single_observer_results():
+    rng = random.Random(RANDOM_SEED)
+    w, h = 24, 18
+    grid = _random_grid(rng, w, h, 0.3)
+    observers = [
+        (rng.randrange(w), rng.randrange(h), rng.randint(1, 8)) for _ in range(12)
+    ]
+    expected = [
+        bytes(GridFOV(radius).compute(x, y, grid, w, h)) for x, y, radius in observers
+    ]
+    with BatchFOV(grid, w, h) as batch:
+        assert batch.compute(observers) == expected
+    with BatchFOV(grid, w, h, workers=2) as batch:
+        assert batch.compute(observers) == expected
+
+
+def test_batch_fov_does_not_touch_tiles():
+    the_map = Map(GAME_DIR, os.path.join("resources", "testmap.map"))
+    flags = bytes(the_map.tiles.flags)
+    batch = BatchFOV(the_map.transparency(), the_map.cols, the_map.rows)
+    batch.compute([(*the_map.player_pos, 5)])
+    assert bytes(the_map.tiles.flags) == flags
+
+
+def test_implementations_match_reference_on_synthetic_maps():
+    rng = random.Random(RANDOM_SEED)
+    for name, make_map in MAPS.items():
+        grid = make_map(31, 23, rng)
+        origins = [(rng.randrange(31), rng.randrange(23)) for _ in range(5)]
+        for impl in IMPLEMENTATIONS:
+            assert verify(impl, grid, 31, 23, 8, origins) == [], (name, impl)
+
+
+def test_benchmark_reports_every_mismatch(monkeypatch):
+    monkeypatch.setitem(
+        IMPLEMENTATIONS, "blind", lambda grid, w, h, radius: lambda x, y: bytes(w * h)
+    )
+    lines = []
+    failures = run(["open"], [16], [4], ["blind"], 4, 3, out=lines.append)
+    assert failures == 3
+    assert "FAIL 3/3" in lines[1]
+    assert lines[2].count("(") == 3
@@ -0,0 +1,82 @@
+import random
+
+from pitd.map.batch import BatchGenerator, BSPParams, MapGenParams, unpack_rooms
+from pitd.map.bsp import BSP
+from pitd.map.map_gen import MapGen, _RectGrid
+from pitd.math.rect import Rect
+from pitd.rand import Seed
+
+BSP_PARAMS = BSPParams(600, 600, 80, 50, 5, (40, 40), (90, 90), max_rooms=6)
+
+
+def test_seed_rng_streams():
+    seed = Seed("hello world")
+    assert seed.rng().random() == random.Random(seed.get()).random()
+    assert seed.rng("debug").random() != seed.rng().random()
+    assert seed.rng("debug").random() == Seed("hello world").rng("debug").random()
+
+
+def test_generators_ignore_global_random():
+    def build():
+        tree = BSP(600, 600, 80, 50)
+        tree.generate("test", 5)
+        random.seed(1)
+        tree.generate_rooms((40, 40), (90, 90))
+        gen = MapGen(30, 30, "test")
+        random.random()
+        gen.generate(3, 6)
+        return list(tree.room_bounds()), gen.map
+
+    assert build() == build()
+
+
+def test_batch_matches_serial():
+    seeds = [f"seed{i}" for i in range(12)]
+    serial = BatchGenerator(BSP_PARAMS).generate(seeds)
+    with BatchGenerator(BSP_PARAMS, workers=2) as batch:
+        assert batch.generate(seeds) == serial
+    rooms = unpack_rooms(serial[0])
+    assert 0 < len(rooms) <= 6
+    assert all(r.x + r.w <= 600 and r.y + r.h <= 600 for r in rooms)
+
+
+def test_mapgen_params_pack_grid():
+    (grid,) = BatchGenerator(MapGenParams(20, 20, 3, 5)).generate(["grid"])
+    gen = MapGen(20, 20, "grid")
+    gen.generate(3, 5)
+    assert grid == gen.map
+
+
+def test_rect_grid_finds_first_placed_neighbour():
+    rng = random.Random(7)
+    grid = _RectGrid(60, 40, 8)
+    placed = []
+    for _ in range(200):
+        rect = Rect(
+            rng.randint(1, 50), rng.randint(1, 30), rng.randint(0, 9), rng.randint(0, 9)
+        )
+        expected = next((r for r in placed if r.collides_near(rect)), None)
+        assert grid.first_near(rect) is expected
+        if expected is None:
+            grid.add(rect)
+            placed.append(rect)
+
+
+def test_mapgen_non_square_maps_stay_in_bounds():
+    gen = MapGen(80, 30, "wide")
+    gen.generate(5, 9)
+    assert len(gen.map) == 80 * 30
+    assert any(gen.map)
+
+
+def test_mapgen_debug_surface_is_cached_and_scaled():
+    gen = MapGen(20, 20, "grid")
+    gen.generate(3, 5)
+    surface = gen.debug_surface(4)
+    assert surface.get_size() == (80, 80)
+    assert gen.debug_surface(4) is surface
+    x, y = next((i % 20, i // 20) for i, v in enumerate(gen.map) if v)
+    assert tuple(surface.get_at((x * 4 + 3, y * 4 + 3)))[:3] == (255, 255, 255)
+    assert tuple(surface.get_at((0, 0)))[:3] == (255, 0, 0)
+    gen.load_grid(bytes(400))
+    assert gen.debug_surface(4) is not surface
@@ -0,0 +1,61 @@
+import os
+
+import pygame
+
+from pitd import PITD
+from pitd.scene.bsp_scene import BSPScene
+
+
+def test_simulate_runs_requested_frames():
+    game = PITD(os.getcwd(), (320, 240), headless=True)
+    assert game.simulate(25) == 25
+    assert game.frames == 25
+    assert game.surface.get_size() == (320, 240)
+
+
+def test_simulate_spends_frames_on_the_target_scene():
+    game = PITD(os.getcwd(), (320, 240), headless=True, profile=True)
+    assert isinstance(game.scene, BSPScene)
+    assert game.simulate(25) == 25
+    assert game.profiler.scenes == ["BSPScene"]
+    assert game.profiler.frames("BSPScene") == 25
+
+
+def test_simulate_stops_when_quit():
+    game = PITD(os.getcwd(), (320, 240), headless=True)
+    game.running = False
+    assert game.simulate(10) == 0
+
+
+def test_simulate_exports_profile(tmp_path):
+    path = str(tmp_path / "profile.json")
+    game = PITD(os.getcwd(), (320, 240), headless=True, profile_path=path)
+    game.show_profile = True
+    game.simulate(5)
+    assert sum(game.profiler.frames(scene) for scene in game.profiler.scenes) == 5
+    assert os.path.exists(path)
+
+
+def test_headless_restores_video_driver(monkeypatch):
+    monkeypatch.delenv("SDL_VIDEODRIVER", raising=False)
+    PITD(os.getcwd(), (320, 240), headless=True)
+    assert "SDL_VIDEODRIVER" not in os.environ
+    monkeypatch.setenv("SDL_VIDEODRIVER", "offscreen")
+    PITD(os.getcwd(), (320, 240), headless=True)
+    assert os.environ["SDL_VIDEODRIVER"] == "offscreen"
+
+
+def test_render_pushes_only_dirty_rects(monkeypatch):
+    calls = []
+    monkeypatch.setattr(pygame.display, "flip", lambda: calls.append("flip"))
+    monkeypatch.setattr(pygame.display, "update", lambda rects: calls.append(rects))
+    game = PITD(os.getcwd(), (320, 240), headless=True)
+    game.headless = False
+    game._render()
+    assert calls == ["flip"]
+    game._render()
+    assert calls == ["flip"]
+    dirty = [pygame.Rect(1, 2, 3, 4)]
+    monkeypatch.setattr(game.scene, "dirty_rects", lambda: dirty)
+    game._render()
+    assert calls == ["flip", dirty]
@@ -0,0 +1,78 @@
+import dataclasses
+import os
+
+import pytest
+
+from pitd.map.atomic import atomic_write
+from pitd.map.batch import BSPParams, MapGenParams
+from pitd.map.bsp import BSP
+from pitd.map.layout_cache import LayoutCache
+
+PARAMS = BSPParams(600, 600, 80, 50, 5, (40, 40), (90, 90), rooms_only=False)
+
+
+def test_bsp_round_trips_through_bytes():
+    tree = PARAMS.build("test")
+    copy = BSP.from_bytes(tree.to_bytes())
+    assert len(copy) == len(tree) and copy.rooms == tree.rooms
+    assert list(copy.room_bounds()) == list(tree.room_bounds())
+    assert [copy.node(i).x for i in copy.preorder()] == [
+        tree.node(i).x for i in tree.preorder()
+    ]
+
+
+def test_loaded_bsp_keeps_generating_like_the_original():
+    tree = PARAMS.build("test")
+    copy = BSP.from_bytes(tree.to_bytes())
+    tree.prune(3)
+    copy.prune(3)
+    assert list(copy.room_bounds()) == list(tree.room_bounds())
+    tree.generate_rooms((40, 40), (90, 90))
+    copy.generate_rooms((40, 40), (90, 90))
+    assert list(copy.room_bounds()) == list(tree.room_bounds())
+
+
+def test_fetch_generates_once(tmp_path):
+    cache = LayoutCache(str(tmp_path))
+    first = cache.fetch(PARAMS, "daily")
+    assert (cache.hits, cache.misses) == (0, 1)
+    assert LayoutCache(str(tmp_path)).fetch(PARAMS, "daily") == first
+    assert cache.fetch(PARAMS, "daily") == first
+    assert cache.hits == 1
+
+
+def test_key_covers_params_and_version(tmp_path, monkeypatch):
+    cache = LayoutCache(str(tmp_path))
+    key = cache.key(PARAMS, "daily")
+    assert cache.key(dataclasses.replace(PARAMS, max_depth=6), "daily") != key
+    assert cache.key(PARAMS, "other") != key
+    monkeypatch.setattr(BSPParams, "version", BSPParams.version + 1)
+    assert cache.key(PARAMS, "daily") != key
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = LayoutCache(str(tmp_path), max_bytes=2500)
+    params = MapGenParams(30, 30, 3, 6)
+    keys = []
+    for i, seed in enumerate(["a", "b"]):
+        cache.fetch(params, seed)
+        keys.append(cache.key(params, seed))
+        os.utime(cache.path(keys[-1]), (i, i))
+    assert cache.get(keys[0]) is not None
+    os.utime(cache.path(keys[0]), (10, 10))
+    cache.fetch(params, "c")
+    assert cache.size() <= 2500
+    assert os.path.exists(cache.path(keys[0]))
+    assert not os.path.exists(cache.path(keys[1]))
+
+
+def test_atomic_write_keeps_old_file_on_error(tmp_path):
+    path = str(tmp_path / "data.bin")
+    with atomic_write(path) as f:
+        f.write(b"old")
+    with pytest.raises(RuntimeError):
+        with atomic_write(path) as f:
+            f.write(b"new")
+            raise RuntimeError
+    assert open(path, "rb").read() == b"old"
+    assert os.listdir(tmp_path) == ["data.bin"]
@@ -0,0 +1,110 @@
+import os
+
+import pygame
+import pytest
+
+import pitd
+from pitd import PITD
+from pitd.scene import Scene
+
+
+class FakeTime:
+    # Stands in for the time module in pitd: sleeping advances the clock.
+    def __init__(self):
+        self.now = 0.0
+
+    def perf_counter(self):
+        return self.now
+
+    def sleep(self, delay):
+        self.now += delay
+
+
+class StubScene(Scene):
+    def __init__(self, game, clock, limit, costs=(), redraw=True):
+        self.game = game
+        self.clock = clock
+        self.limit = limit
+        # Seconds the n-th update takes on the fake clock.
+        self.costs = list(costs)
+        self.redraw = redraw
+        self.updates = []
+
+    def render(self, surface):
+        pass
+
+    def update(self, dt):
+        self.updates.append(self.clock.now)
+        if self.costs:
+            self.clock.now += self.costs.pop(0)
+        if len(self.updates) >= self.limit:
+            self.game.running = False
+        return self
+
+    def get_event(self, event):
+        pass
+
+    def set_data(self, name, value):
+        pass
+
+    def should_quit(self):
+        return False
+
+    def needs_render(self):
+        return self.redraw
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeTime()
+    monkeypatch.setattr(pitd, "time", fake)
+    monkeypatch.setattr(pygame.event, "get", lambda: [])
+    monkeypatch.setattr(pygame.display, "flip", lambda: None)
+    monkeypatch.setattr(pygame.display, "update", lambda rects: None)
+    return fake
+
+
+def _game(clock, limit, **kwargs):
+    options = {key: kwargs.pop(key) for key in ("costs", "redraw") if key in kwargs}
+    # Power-of-two rates keep the fake clock's arithmetic exact.
+    kwargs.setdefault("sim_rate", 64.0)
+    kwargs.setdefault("render_rate", 64.0)
+    game = PITD(os.getcwd(), (320, 240), headless=True, **kwargs)
+    # run() hands headless games to simulate(); take the real-time loop.
+    game.headless = False
+    game.scene = StubScene(game, clock, limit, **options)
+    return game
+
+
+def test_run_steps_at_the_simulation_rate(clock):
+    game = _game(clock, 64)
+    game.run()
+    dt = 1.0 / 64.0
+    assert game.scene.updates == [i * dt for i in range(1, 65)]
+
+
+def test_run_caps_catch_up_steps_and_drops_the_backlog(clock):
+    game = _game(clock, 7, max_frame_skip=5, costs=[0.5])
+    game.run()
+    dt = 1.0 / 64.0
+    stalled = dt + 0.5
+    # Five catch-up steps at once, then the remaining lag is dropped and
+    # the next step comes one dt later instead of more catching up.
+    assert game.scene.updates == [dt, *[stalled] * 5, stalled + dt]
+
+
+def test_run_idles_on_the_event_queue_when_nothing_to_draw(clock, monkeypatch):
+    waits = []
+
+    def wait(timeout):
+        waits.append(timeout)
+        clock.now += timeout / 1000.0
+        return pygame.event.Event(pygame.NOEVENT)
+
+    monkeypatch.setattr(pygame.event, "wait", wait)
+    game = _game(clock, 3, redraw=False, idle_timeout=0.5)
+    game.run()
+    # A single update follows each wait instead of catching up the time
+    # spent blocked.
+    assert game.scene.updates == [0.5, 1.0, 1.5]
+    assert waits and set(waits) == {500}
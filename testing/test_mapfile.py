@@ -0,0 +1,161 @@
+import io
+import os
+import tracemalloc
+from pitd.map.compiled import (
+    compile_map,
+    compiled_path,
+    load_map,
+    open_compiled,
+    read_layout,
+)
+from pitd.map.mapfile import MapParser
+from pitd.map.tiles import FLAG_PLAYER, TileType
+
+GAME_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEST_MAP = os.path.join(GAME_DIR, "resources", "testmap.map")
+
+SMALL_MAP = """[mapinfo]
+size=4,3
+[/mapinfo]
+[defs]
+player=@
+floor=.
+wall=#
+[/defs]
+[map]
+####
+#@.#
+##
+[/map]
+"""
+
+
+def _parse(text):
+    parser = MapParser()
+    parser.parse(io.BytesIO(text.encode("utf-8")))
+    return parser
+
+
+def test_parse_small_map():
+    parser = _parse(SMALL_MAP)
+    tiles = parser.tiles
+    assert parser.size == (4, 3)
+    assert (tiles.width, tiles.height) == (4, 3)
+    assert parser.player_pos == (1, 1)
+    assert parser.player_str == "@"
+    assert tiles.tile(1, 1).c == "." and tiles.tile(1, 1).has_player
+    assert tiles.type_at(2, 1) == TileType.FLOOR
+    assert tiles.type_at(3, 2) == TileType.EMPTY
+    assert parser.chars == {"#", "@", "."}
+
+
+def test_non_ascii_rows_match_fast_path():
+    fast = _parse(SMALL_MAP)
+    slow = _parse(SMALL_MAP.replace("#@.#", "#@.#░").replace("size=4,3", "size=5,3"))
+    for y in range(3):
+        for x in range(4):
+            a, b = fast.tiles.tile(x, y), slow.tiles.tile(x, y)
+            assert (a.c, a.tile_type, a.has_player) == (b.c, b.tile_type, b.has_player)
+    assert slow.tiles.type_at(4, 1) == TileType.EMPTY
+    assert slow.player_pos == fast.player_pos
+
+
+def test_parse_file_reports_progress():
+    reports = []
+    parser = MapParser(progress_rows=8).parse_file(
+        TEST_MAP, lambda done, total: reports.append((done, total))
+    )
+    size = os.path.getsize(TEST_MAP)
+    assert parser.tiles.height == 20
+    assert len(reports) == 3
+    assert reports[-1] == (size, size)
+    assert [done for done, _ in reports] == sorted(done for done, _ in reports)
+    assert sum(1 for f in parser.tiles.flags if f & FLAG_PLAYER) == 1
+
+
+def _copy_test_map(tmp_path):
+    source = tmp_path / "testmap.map"
+    source.write_bytes(open(TEST_MAP, "rb").read())
+    return str(source)
+
+
+def test_compiled_map_matches_parsed(tmp_path):
+    source = _copy_test_map(tmp_path)
+    parsed = MapParser().parse_file(source).data()
+    loaded = load_map(source)
+    assert os.path.exists(compiled_path(source))
+    assert isinstance(loaded.tiles.types, memoryview)
+    assert bytes(loaded.tiles.types) == bytes(parsed.tiles.types)
+    assert bytes(loaded.tiles.glyphs) == bytes(parsed.tiles.glyphs)
+    assert bytes(loaded.tiles.flags) == bytes(parsed.tiles.flags)
+    assert loaded.tiles.glyph_chars == parsed.tiles.glyph_chars
+    assert (loaded.size, loaded.player_pos, loaded.player_str) == (
+        parsed.size,
+        parsed.player_pos,
+        parsed.player_str,
+    )
+    assert (loaded.tile_data, loaded.chars) == (parsed.tile_data, parsed.chars)
+
+
+def test_compiled_map_is_copy_on_write(tmp_path):
+    source = _copy_test_map(tmp_path)
+    load_map(source)
+    before = open(compiled_path(source), "rb").read()
+    loaded = load_map(source)
+    loaded.tiles.tile(1, 1).visible = False
+    loaded.tiles.fill_flag(FLAG_PLAYER, False)
+    assert open(compiled_path(source), "rb").read() == before
+
+
+def test_compiled_map_invalidated_by_changes(tmp_path):
+    source = _copy_test_map(tmp_path)
+    load_map(source)
+    stat = os.stat(source)
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert load_map(source).tiles.type_at(1, 1) == TileType.FLOOR
+    with open(source, "r+b") as f:
+        text = f.read().replace(b"#......###", b"##.....###")
+        f.seek(0)
+        f.write(text)
+    assert load_map(source).tiles.type_at(1, 1) == TileType.WALL
+
+
+def test_damaged_compiled_map_is_rebuilt(tmp_path):
+    source = _copy_test_map(tmp_path)
+    target = compiled_path(source)
+    load_map(source)
+    good = open(target, "rb").read()
+    meta_end = read_layout(target).offset
+    with open(target, "r+b") as f:
+        f.truncate(len(good) - 5)
+    assert load_map(source).tiles.type_at(1, 1) == TileType.FLOOR
+    assert open(target, "rb").read() == good
+    with open(target, "r+b") as f:
+        # Damage the JSON metadata that follows the header.
+        f.seek(meta_end - 2)
+        f.write(b"\xff\xff")
+    assert load_map(source).tiles.type_at(1, 1) == TileType.FLOOR
+    assert open(target, "rb").read() == good
+
+
+def test_compile_streams_rows_to_disk(tmp_path):
+    width, height = 2000, 1500
+    source = tmp_path / "large.map"
+    with open(source, "w") as f:
+        f.write("[defs]\nplayer=@\nfloor=.\nwall=#\n[/defs]\n[map]\n")
+        f.write("@" + "." * (width - 1) + "\n")
+        for y in range(1, height):
+            f.write(("#." * (width // 2)) + "\n")
+        f.write("[/map]\n")
+    tracemalloc.start()
+    try:
+        compile_map(str(source))
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    # Holding the three planes would take 3 * width * height bytes.
+    assert peak < width * height
+    tiles = open_compiled(compiled_path(str(source))).tiles
+    assert (tiles.width, tiles.height) == (width, height)
+    assert tiles.tile(0, 0).has_player
+    assert tiles.type_at(0, height - 1) == TileType.WALL
@@ -0,0 +1,65 @@
+import os
+from pitd.map.paged import PagedMap
+from pitd.map.tiles import TileType
+from pitd.scene.mapscene import Map
+
+GAME_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _maps(tmp_path, **kwargs):
+    source = tmp_path / "testmap.map"
+    source.write_bytes(
+        open(os.path.join(GAME_DIR, "resources", "testmap.map"), "rb").read()
+    )
+    return Map(str(tmp_path), "testmap.map"), PagedMap(
+        str(tmp_path), "testmap.map", **kwargs
+    )
+
+
+def test_paged_map_matches_resident_map(tmp_path):
+    the_map, paged = _maps(tmp_path, region_size=7, max_regions=2)
+    assert (paged.cols, paged.rows) == (the_map.cols, the_map.rows)
+    assert paged.player_pos == the_map.player_pos
+    for y in range(the_map.rows):
+        for x in range(the_map.cols):
+            a, b = the_map.tile(x, y), paged.tile(x, y)
+            assert (a.c, a.tile_type, a.has_player) == (b.c, b.tile_type, b.has_player)
+    assert paged.resident_regions == 2
+    assert paged.evictions == paged.loads - 2
+
+
+def test_paged_transparency_window(tmp_path):
+    the_map, paged = _maps(tmp_path, region_size=6, max_regions=3)
+    for window in ((0, 0, 20, 20), (3, 5, 11, 9), (13, 13, 7, 7), (5, 5, 1, 1)):
+        assert paged.transparency_window(*window) == the_map.transparency_window(
+            *window
+        )
+
+
+def test_paged_edits_pin_their_region(tmp_path):
+    _, paged = _maps(tmp_path, region_size=5, max_regions=1)
+    revision = paged.revision
+    paged.set(1, 1, "tile_type", TileType.WALL)
+    assert paged.revision == revision + 1
+    for y in range(0, 20, 5):
+        for x in range(0, 20, 5):
+            paged.tile(x, y)
+    assert paged.type_at(1, 1) == TileType.WALL
+    assert paged.transparency_window(1, 1, 1, 1) == b"\x00"
+
+
+def test_paged_flag_changes_do_not_pin(tmp_path):
+    _, paged = _maps(tmp_path, region_size=5, max_regions=2)
+    x, y = paged.player_pos
+    for nx in range(20):
+        paged.set(x, y, "has_player", False)
+        paged.set(nx, 10, "has_player", True)
+        paged.set(nx, 11, "visible", True)
+        x, y = nx, 10
+        assert paged.resident_regions <= 2
+    for ry in range(4):
+        for rx in range(4):
+            paged.region(rx, ry)
+    assert paged.tile(19, 10).has_player and not paged.tile(5, 10).has_player
+    assert paged.tile(3, 11).visible
+    assert len(paged._flags) <= 21
@@ -0,0 +1,67 @@
+import csv
+import json
+
+from pitd.profiler import EVENTS, FLIP, RENDER, UPDATE, FrameProfiler, percentile
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def record(profiler, clock, scene, timings):
+    profiler.begin(scene)
+    for phase, seconds in zip((EVENTS, UPDATE, RENDER, FLIP), timings):
+        clock.now += seconds
+        profiler.lap(phase)
+    profiler.end()
+
+
+def test_percentile_nearest_rank():
+    values = [float(i) for i in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 95) == 95.0
+    assert percentile(values, 100) == 100.0
+    assert percentile([], 50) == 0.0
+
+
+def test_ring_keeps_latest_frames_per_scene():
+    clock = FakeClock()
+    profiler = FrameProfiler(capacity=4, clock=clock)
+    for i in range(6):
+        record(profiler, clock, "A", (0.001, 0.001 * i, 0.0, 0.0))
+    record(profiler, clock, "B", (0.0, 0.005, 0.0, 0.0))
+    assert profiler.frames("A") == 6
+    assert [round(t * 1000) for t in profiler.samples("A", UPDATE)] == [2, 3, 4, 5]
+    assert [round(t * 1000) for t in profiler.samples("B", UPDATE)] == [5]
+    summary = profiler.summary("A")
+    assert round(summary["update"]["max"]) == 5
+    assert round(summary["total"]["p50"]) == 4
+
+
+def test_disabled_profiler_records_nothing():
+    clock = FakeClock()
+    profiler = FrameProfiler(enabled=False, clock=clock)
+    record(profiler, clock, "A", (0.001, 0.001, 0.001, 0.001))
+    assert profiler.scenes == []
+
+
+def test_export_json_and_csv(tmp_path):
+    clock = FakeClock()
+    profiler = FrameProfiler(capacity=2, clock=clock)
+    for _ in range(3):
+        record(profiler, clock, "A", (0.001, 0.002, 0.003, 0.004))
+
+    profiler.export(str(tmp_path / "profile.json"))
+    data = json.loads((tmp_path / "profile.json").read_text())
+    assert data["scenes"]["A"]["frames"] == 3
+    assert len(data["scenes"]["A"]["samples"]["flip"]) == 2
+
+    profiler.export(str(tmp_path / "profile.csv"))
+    with open(tmp_path / "profile.csv", newline="") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == ["scene", "frame", "events", "update", "render", "flip"]
+    assert [row[1] for row in rows[1:]] == ["1", "2"]
@@ -0,0 +1,52 @@
+from collections import deque
+
+from pitd.fov import GridFOV
+from pitd.map.batch import BSPParams
+from pitd.map.raster import rasterize, rasterize_types, to_map_data
+from pitd.map.tiles import TileType
+
+PARAMS = BSPParams(120, 90, 12, 20, 6, (4, 4), (10, 10))
+
+
+def reachable(types, width, height, start):
+    seen = {start}
+    queue = deque([start])
+    while queue:
+        x, y = queue.popleft()
+        for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+            if (
+                0 <= nx < width
+                and 0 <= ny < height
+                and (nx, ny) not in seen
+                and types[ny * width + nx] == TileType.FLOOR
+            ):
+                seen.add((nx, ny))
+                queue.append((nx, ny))
+    return seen
+
+
+def test_rooms_are_floor_and_connected():
+    tree = PARAMS.build("raster")
+    types = rasterize_types(tree)
+    assert len(types) == 120 * 90
+    rooms = list(tree.room_bounds())
+    assert rooms
+    for x, y, w, h in rooms:
+        for yy in range(y, y + h):
+            assert types[yy * 120 + x : yy * 120 + x + w] == bytes([TileType.FLOOR]) * w
+    data = to_map_data(tree)
+    seen = reachable(types, 120, 90, data.player_pos)
+    assert all((x, y) in seen for x, y, _, _ in rooms)
+    assert set(types) == {TileType.FLOOR, TileType.WALL}
+
+
+def test_map_data_feeds_tiles_and_fov():
+    tree = PARAMS.build("raster")
+    data = to_map_data(tree, corridor_width=2)
+    tiles = data.tiles
+    px, py = data.player_pos
+    assert tiles.tile(px, py).has_player
+    assert tiles.tile(px, py).c == "."
+    assert rasterize(tree).types == rasterize_types(tree)
+    mask = GridFOV(5).compute(px, py, tiles.transparency(), tiles.width, tiles.height)
+    assert mask[py * tiles.width + px]
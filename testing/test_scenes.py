@@ -0,0 +1,161 @@
+import os
+import threading
+
+import pygame
+import pytest
+
+from pitd import PITD
+from pitd.scene import Scene, registry
+from pitd.scene.bsp_scene import BSPScene
+from pitd.scene.loading import LoadingScene
+from pitd.scene.mapgen_scene import MapGenScene
+from pitd.scene.mapscene import MapScene, TileType
+
+
+class SlowScene(Scene):
+    def __init__(self, fail=False):
+        self.release = threading.Event()
+        self.loaded = False
+        self.fail = fail
+
+    def load(self):
+        self.release.wait(5)
+        if self.fail:
+            raise RuntimeError("load failed")
+        self.loaded = True
+
+    def activate(self):
+        self.activated_on = threading.current_thread()
+
+    def render(self, surface):
+        pass
+
+    def update(self, dt):
+        return self
+
+    def get_event(self, event):
+        pass
+
+    def set_data(self, name, value):
+        pass
+
+    def should_quit(self):
+        return False
+
+
+def setup_module():
+    pygame.font.init()
+
+
+def test_registry_builds_scenes_lazily(monkeypatch):
+    monkeypatch.setattr(registry, "_SCENES", dict(registry._SCENES))
+    registry.register("slow", f"{__name__}:SlowScene")
+    assert "slow" in registry.scene_names()
+    assert isinstance(registry.create("slow", "."), SlowScene)
+    with pytest.raises(KeyError):
+        registry.scene_class("missing")
+    with pytest.raises(ValueError):
+        registry.register("bad", "no_colon")
+
+
+def test_loading_scene_hands_over_after_load():
+    target = SlowScene()
+    loading = LoadingScene(target)
+    surface = pygame.Surface((200, 100))
+    assert loading.update(0.1) is loading
+    loading.render(surface)
+    assert loading.dirty_rects() is None
+    target.release.set()
+    loading._future.result(5)
+    assert loading.update(0.1) is target
+    assert target.loaded
+    assert target.activated_on is threading.main_thread()
+
+
+def test_loading_scene_reraises_load_errors():
+    target = SlowScene(fail=True)
+    loading = LoadingScene(target)
+    target.release.set()
+    with pytest.raises(RuntimeError):
+        loading._future.result(5)
+    with pytest.raises(RuntimeError):
+        loading.update(0.1)
+
+
+def test_mapgen_scene_caches_only_seeded_layouts(tmp_path):
+    assert MapGenScene(cache_dir=str(tmp_path)).cache is None
+    first = MapGenScene(cache_dir=str(tmp_path), seed="daily")
+    first.load()
+    second = MapGenScene(cache_dir=str(tmp_path), seed="daily")
+    second.load()
+    assert second.cache is not None and second.cache.hits == 1
+    assert second.map_gen.map == first.map_gen.map
+
+
+def test_static_scene_draws_once_per_invalidate(monkeypatch):
+    scene = BSPScene()
+    draws = []
+    monkeypatch.setattr(scene, "draw", draws.append)
+    surface = pygame.Surface((100, 100))
+    assert scene.needs_render()
+    scene.render(surface)
+    scene.render(surface)
+    assert draws == [surface]
+    assert scene.dirty_rects() is None
+    assert scene.dirty_rects() == []
+    assert not scene.needs_render()
+    scene.invalidate()
+    assert scene.needs_render()
+    scene.render(surface)
+    assert len(draws) == 2 and scene.dirty_rects() is None
+
+
+class _Keys(dict):
+    # Stands in for pygame.key.get_pressed(): unlisted keys are released.
+    def __missing__(self, key):
+        return False
+
+
+def _step_player(scene, monkeypatch):
+    # Press the first movement key that leads onto an open tile.
+    x, y = scene.player_pos
+    for key, dx, dy in (
+        (pygame.K_d, 1, 0),
+        (pygame.K_a, -1, 0),
+        (pygame.K_s, 0, 1),
+        (pygame.K_w, 0, -1),
+    ):
+        if scene.the_map.type_at(x + dx, y + dy) != TileType.WALL:
+            monkeypatch.setattr(pygame.key, "get_pressed", lambda: _Keys({key: True}))
+            scene.update(0.1)
+            return
+    raise AssertionError("player is walled in")
+
+
+def test_map_scene_redraws_only_dirty_rects(monkeypatch):
+    game = PITD(os.getcwd(), (800, 600), headless=True, scene="map")
+    scene = game.scene
+    assert isinstance(scene, MapScene)
+    surface = pygame.Surface((800, 600))
+    assert scene.needs_render()
+    scene.render(surface)
+    assert scene.dirty_rects() is None
+    assert not scene.needs_render()
+    assert scene.dirty_rects() == []
+
+    _step_player(scene, monkeypatch)
+    assert scene.needs_render()
+    surface.fill((255, 0, 0))
+    scene.render(surface)
+    rects = scene.dirty_rects()
+    assert rects is not None and len(rects) == 2
+    # Outside the old and new FOV boxes the drawn regions are not copied.
+    outside = [
+        (x, y)
+        for x in range(0, 800, 10)
+        for y in range(0, 600, 10)
+        if not any(rect.collidepoint(x, y) for rect in rects)
+    ]
+    assert outside
+    assert all(surface.get_at(point) == (255, 0, 0) for point in outside)
+    assert not scene.needs_render()
@@ -0,0 +1,65 @@
+import os
+import pytest
+from pitd.map.tiles import FLAG_PLAYER, FLAG_VISIBLE, TileStore, TileType
+from pitd.scene.mapscene import Map
+
+GAME_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _store():
+    tiles = TileStore(3)
+    wall = tiles.glyph_code("#")
+    floor = tiles.glyph_code(".")
+    tiles.append_row(bytes([TileType.WALL] * 3), bytes([wall] * 3), bytes(3))
+    tiles.append_row(
+        bytes([TileType.WALL, TileType.FLOOR]), bytes([wall, floor]), bytes(2)
+    )
+    return tiles
+
+
+def test_append_row_pads_short_rows():
+    tiles = _store()
+    assert (tiles.width, tiles.height) == (3, 2)
+    assert tiles.type_at(2, 1) == TileType.EMPTY
+    assert tiles.tile(2, 1).c == " "
+    assert tiles.tile(1, 1).c == "."
+
+
+def test_append_row_rejects_wide_rows():
+    with pytest.raises(ValueError):
+        _store().append_row(bytes(4), bytes(4), bytes(4))
+
+
+def test_tile_view_writes_through():
+    tiles = _store()
+    view = tiles[1][1]
+    view.has_player = True
+    view.set_visible(True)
+    assert tiles.flags[4] == FLAG_PLAYER | FLAG_VISIBLE
+    view.tile_type = TileType.WALL
+    assert view.is_wall()
+    assert tiles.transparency() == bytearray(b"\x00\x00\x00\x00\x00\x01")
+
+
+def test_fill_flag_keeps_other_flags():
+    tiles = _store()
+    tiles.tile(0, 0).has_player = True
+    tiles.tile(1, 1).visible = True
+    tiles.fill_flag(FLAG_VISIBLE, True)
+    assert all(f & FLAG_VISIBLE for f in tiles.flags)
+    assert [t.has_player for row in tiles for t in row] == [1, 0, 0, 0, 0, 0]
+    tiles.fill_flag(FLAG_VISIBLE, False)
+    assert not any(t.visible for row in tiles for t in row)
+    assert tiles.tile(0, 0).has_player
+    tiles.fill_flag(FLAG_PLAYER, False)
+    assert bytes(tiles.flags) == bytes(6)
+
+
+def test_map_parses_into_tile_store():
+    the_map = Map(GAME_DIR, os.path.join("resources", "testmap.map"))
+    assert (the_map.cols, the_map.rows) == (20, 20)
+    assert the_map.player_pos == (7, 4)
+    player = the_map.tiles.tile(7, 4)
+    assert player.has_player and player.c == "." and not player.is_wall()
+    assert the_map.tiles.type_at(0, 0) == TileType.WALL
+    assert the_map.tiles.type_at(19, 0) == TileType.EMPTY